@@ -0,0 +1,184 @@
+import os
+import re
+import sys
+import threading
+from urllib.parse import urljoin
+
+from lxml import html
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.http_session import make_session
+from common.log import get_logger
+from common.metrics import incr, span
+from common.name_index import index_for, member_filter
+from common.option_cache import OptionList, option_cache
+from common.records import AMGR_HEADERS
+from common.retry import ParseError, retry_call
+from common.table_extract import normalize_text, rows_from_html
+
+DIRECTORY_URL = "https://www.amgr.org/frm_directorySearch.cfm"
+HEADERS = AMGR_HEADERS
+RESULT_ROWS_CSS = "#example tbody tr"
+RESULT_ROWS_XPATH = "//table[@id='example']/tbody/tr"
+RESULTS_TABLE = re.compile(r"""id=["']example["']""")
+FORM_SELECTS = ("stateID", "memberID", "breedID")
+
+logger = get_logger("amgr")
+
+DEFAULT_BREED_MAP = {
+    "(AK) - Ameri-Kiko": "12",
+    "(AC) - American Black": "9",
+    "(AB) - American Boer": "10",
+    "(AD) - American Dapple": "13",
+    "(AM) - American Myotonic": "11",
+    "(AR) - American Red": "1",
+    "(AS) - American Savanna": "8",
+    "(AP) - American Spanish": "14",
+    "(B) - Boer": "3",
+    "(C) - Composite": "4",
+    "(K) - Kiko": "5",
+    "(M) - Myotonic": "6",
+    "(A) - Savanna": "2",
+    "(SP) - Spanish": "7"
+}
+BREED_LABEL = re.compile(r"^\([A-Z]{1,2}\) - \S")
+
+# Shared across threads: readers iterate over ``tuple(breed_map.items())``.
+breed_map = dict(DEFAULT_BREED_MAP)
+_breed_map_lock = threading.Lock()
+
+
+def sync_breed_map(breed_options):
+    """Bring ``breed_map`` in line with the live breedID options in place and report any drift.
+
+    Live keys are written before stale ones are removed, so a concurrent
+    ``breed_map.get`` never sees a breed vanish that the site still offers.
+    """
+    live = {text: value for text, value in breed_options if BREED_LABEL.match(text)}
+    if not live or live == breed_map:
+        return breed_map
+    with _breed_map_lock:
+        for text, value in live.items():
+            if text in breed_map and breed_map[text] != value:
+                logger.warning(f"⚠️ Breed '{text}' is now breedID {value} (was {breed_map[text]}).")
+            breed_map[text] = value
+        for text in breed_map.keys() - live.keys():
+            logger.warning(f"⚠️ Breed '{text}' is no longer offered by the directory.")
+            del breed_map[text]
+    return breed_map
+
+
+def match_member_options(option_texts, member_name):
+    return index_for(tuple(option_texts)).containing(member_name)
+
+
+def member_row_matches(name, expected_member_name):
+    return member_filter(expected_member_name)(name)
+
+
+def select_option_value(options, target_text):
+    value = options.value_for(target_text)
+    return options.first_value if value is None else value
+
+
+def parse_directory_form(page_html, page_url=DIRECTORY_URL):
+    tree = html.fromstring(page_html)
+    forms = tree.xpath("//form[.//select[@name='stateID']]")
+    if not forms:
+        raise ValueError("AMGR directory form not found")
+    form = forms[0]
+
+    action = urljoin(page_url, form.get("action") or page_url)
+    fields = {}
+    for field in form.xpath(".//input[@name]"):
+        if field.get("type", "text").lower() in ("hidden", "submit", "text"):
+            fields[field.get("name")] = field.get("value", "")
+
+    selects = {}
+    for select in form.xpath(".//select[@name]"):
+        selects[select.get("name")] = OptionList(
+            (normalize_text(option.text_content()), option.get("value", normalize_text(option.text_content())))
+            for option in select.xpath("./option")
+        )
+    return action, fields, selects
+
+
+def result_rows(cell_rows, expected_member_name=None):
+    matches = member_filter(expected_member_name)
+    return [cells[1:6] for cells in cell_rows if len(cells) >= 6 and matches(cells[2])]
+
+
+def parse_results_table(page_html, expected_member_name=None):
+    return result_rows(rows_from_html(page_html, RESULT_ROWS_XPATH, 6), expected_member_name)
+
+
+class AmgrHttpClient:
+    def __init__(self, url=DIRECTORY_URL, session=None, timeout=15, cache=None, options=None):
+        self.url = url
+        self.session = session or make_session()
+        self.timeout = timeout
+        self.cache = cache
+        self.options = options or option_cache
+
+    def form(self):
+        return self.options.get(("amgr.form", self.url), self._load_form)
+
+    def _load_form(self):
+        response = retry_call(self._get_form, site="amgr")
+        form = parse_directory_form(response.text, response.url)
+        sync_breed_map(form[2].get("breedID", ()))
+        return form
+
+    def _get_form(self):
+        with span("http_fetch", registry="amgr", request="form"):
+            response = self.session.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def build_form_data(self, state="", breed_name=None, member_name=None):
+        _, fields, selects = self.form()
+        data = dict(fields)
+
+        state_options = selects.get("stateID", OptionList())
+        data["stateID"] = select_option_value(state_options, state) if state else state_options.first_value
+
+        member_options = selects.get("memberID", OptionList())
+        data["memberID"] = member_options.first_value
+        if member_name:
+            matching_members = match_member_options(member_options.texts, member_name)
+            if len(matching_members) == 1:
+                data["memberID"] = member_options.value_for(matching_members[0], partial=False)
+
+        breed_options = selects.get("breedID", OptionList())
+        breed_id = breed_map.get(breed_name) if breed_name else None
+        data["breedID"] = breed_id if breed_id and breed_options.has_value(breed_id) else breed_options.first_value
+        return data
+
+    def fetch_rows(self, action, data):
+        return retry_call(lambda: self.load_rows(action, data), site="amgr")
+
+    def load_rows(self, action, data):
+        with span("http_fetch", registry="amgr", request="results"):
+            response = self.session.post(action, data=data, timeout=self.timeout)
+        response.raise_for_status()
+        if not RESULTS_TABLE.search(response.text):
+            raise ParseError("AMGR response has no results table")
+        with span("extract_page", registry="amgr", engine="http"):
+            rows = parse_results_table(response.text)
+        incr("pages_total", registry="amgr", engine="http")
+        incr("rows_total", len(rows), registry="amgr", engine="http")
+        return rows
+
+    def search(self, state="", breed_name=None, member_name=None):
+        action, _, _ = self.form()
+        data = self.build_form_data(state, breed_name, member_name)
+        if self.cache is None:
+            rows = self.fetch_rows(action, data)
+        else:
+            key = {"url": action, "stateID": data["stateID"], "breedID": data["breedID"], "memberID": data["memberID"]}
+            rows = self.cache.fetch("amgr", key, lambda: self.fetch_rows(action, data))
+        matches = member_filter(member_name)
+        return [row for row in rows if matches(row[1])]
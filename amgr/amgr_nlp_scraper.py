@@ -1,59 +1,70 @@
-import spacy
-from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select, WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from tabulate import tabulate
-import traceback
-import time
 import re
-import difflib
-
-nlp = spacy.load("en_core_web_sm")
-
-breed_map = {
-    "(AK) - Ameri-Kiko": "12",
-    "(AC) - American Black": "9",
-    "(AB) - American Boer": "10",
-    "(AD) - American Dapple": "13",
-    "(AM) - American Myotonic": "11",
-    "(AR) - American Red": "1",
-    "(AS) - American Savanna": "8",
-    "(AP) - American Spanish": "14",
-    "(B) - Boer": "3",
-    "(C) - Composite": "4",
-    "(K) - Kiko": "5",
-    "(M) - Myotonic": "6",
-    "(A) - Savanna": "2",
-    "(SP) - Spanish": "7"
-}
-
-def parse_command(command):
-    doc = nlp(command)
-
+from itertools import chain
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from amgr_http_client import (
+    DIRECTORY_URL, FORM_SELECTS, AmgrHttpClient, HEADERS, RESULT_ROWS_CSS, RESULT_ROWS_XPATH, breed_map,
+    match_member_options, result_rows, sync_breed_map,
+)
+from common.adapters import RegistryAdapter, register_adapter
+from common.fast_parse import fast_parse
+from common.log import get_logger
+from common.metrics import incr, span, start_exporters
+from common.nlp_loader import get_nlp
+from common.option_cache import option_cache, read_select_options
+from common.parse_cache import cached_parse
+from common.name_index import NameIndex
+from common.records import AmgrRecord, Record
+from common.retry import ParseError, classify, retry_call
+from common.readiness import (
+    arm_datatable_draw, timed_wait, wait_for_datatable_redraw, wait_for_document_ready
+)
+from common.table_extract import datatable_data, expand_datatable, extract_rows, goto_datatable_page
+
+logger = get_logger("amgr")
+
+
+@cached_parse("amgr.parse_command")
+def parse_command(command, doc=None):
     state = None
     member = None
     breed_name = None
 
-    for ent in doc.ents:
-        if ent.label_ == "GPE":
-            state = ent.text
-            break
+    fast = fast_parse(command) if doc is None else None
+    if fast is not None:
+        state = fast.state
+        member = fast.member_name.title() or None
+    else:
+        if doc is None:
+            doc = get_nlp()(command)
+
+        for ent in doc.ents:
+            if ent.label_ == "GPE":
+                state = ent.text
+                break
+
+        for ent in doc.ents:
+            if ent.label_ == "PERSON":
+                member = ent.text
+                break
 
-    for ent in doc.ents:
-        if ent.label_ == "PERSON":
-            member = ent.text
-            break
-    
     if not member:
         match = re.search(r"\b([A-Z][a-z]+)'s\b", command)
         if match:
             member_candidate = match.group(1).strip()
             if len(member_candidate) > 2:
                 member = member_candidate
-                print(f"🔎 Found possessive member name: {member} (partial)")
+                logger.info(f"🔎 Found possessive member name: {member} (partial)")
 
 
     breed_pattern = re.search(r"\(([A-Z]{1,2})\)\s*-\s*([a-z\s]+)", command, re.IGNORECASE)
@@ -61,7 +72,7 @@ def parse_command(command):
         breed_name = f"({breed_pattern.group(1).upper()}) - {breed_pattern.group(2).title()}"
     else:
         command_text = command.lower()
-        for key in breed_map.keys():
+        for key, _ in tuple(breed_map.items()):
             breed_only = key.split(" - ")[1].lower()
             if breed_only in command_text:
                 breed_name = key
@@ -77,207 +88,335 @@ def parse_command(command):
     }
 
 
-def extract_table_data(driver, expected_member_name=None):
-    print("⏳ Waiting for results table to load...")
-    wait = WebDriverWait(driver, 10)
-    all_data = []
-
-    simplified_expected = None
-    if expected_member_name:
-        simplified_expected = re.sub(r"[^a-z]", "", expected_member_name.lower())
-
-    while True:
+def extract_all_pages(driver):
+    data = datatable_data(driver, "example")
+    if data is None:
+        return None
+    rows, total = data
+    if len(rows) == total:
+        return rows
+
+    armed = arm_datatable_draw(driver, "example")
+    expand_datatable(driver, "example")
+    wait_for_datatable_redraw(driver, "example", armed, step="amgr.expand_pages")
+    rows = extract_rows(driver, RESULT_ROWS_CSS, RESULT_ROWS_XPATH)
+    if len(rows) == total:
+        return rows
+    logger.warning(f"⚠️ Expanded table shows {len(rows)} of {total} rows.")
+    return None
+
+
+def count_page(page):
+    incr("pages_total", registry="amgr", engine="selenium")
+    incr("rows_total", len(page), registry="amgr", engine="selenium")
+    return page
+
+
+def read_result_page(driver, wait, expected_member_name=None):
+    """Rows of the page on screen and whether it is the last one."""
+    wait.until(EC.presence_of_element_located((By.ID, "example")))
+    with span("extract_page", registry="amgr", engine="selenium"):
+        cell_rows = extract_rows(driver, RESULT_ROWS_CSS, RESULT_ROWS_XPATH, 6)
+        page = result_rows(cell_rows, expected_member_name)
+    return page, "disabled" in driver.find_element(By.ID, "example_next").get_attribute("class")
+
+
+def current_result_page(driver):
+    """0-based page the DataTables pager marks as current, or None when it shows none."""
+    buttons = driver.find_elements(By.CSS_SELECTOR, "#example_paginate .paginate_button.current")
+    text = buttons[0].text.strip() if buttons else ""
+    return int(text) - 1 if text.isdigit() else None
+
+
+def _jump_to_result_page(driver, index):
+    armed = arm_datatable_draw(driver, "example")
+    if armed is None:
+        return False
+    goto_datatable_page(driver, "example", index)
+    wait_for_datatable_redraw(driver, "example", armed, step="amgr.next_page")
+    return True
+
+
+def show_result_page(driver, index, slack=3):
+    """Show page ``index`` (0-based) of the results table.
+
+    Uses the DataTables API when the page exposes it, which is absolute and
+    so retried freely. Otherwise clicks Next until the pager reads ``index``,
+    re-reading it after every click so a click whose redraw wait timed out
+    is never repeated blindly; ``slack`` bounds the clicks that fail to move it.
+    """
+    if retry_call(lambda: _jump_to_result_page(driver, index), site="amgr"):
+        return
+    current = current_result_page(driver)
+    if current is None:
+        raise ParseError("AMGR pager shows no current page")
+    clicks = index - current + slack
+    while current != index:
+        if current > index or clicks <= 0:
+            raise ParseError(f"AMGR pager is on page {current + 1}, expected {index + 1}")
+        clicks -= 1
+        first_row = next(iter(driver.find_elements(By.CSS_SELECTOR, RESULT_ROWS_CSS + ":first-child")), None)
+        driver.find_element(By.ID, "example_next").click()
         try:
-            table = wait.until(EC.presence_of_element_located((By.ID, "example")))
-            tbody = table.find_element(By.TAG_NAME, "tbody")
-            rows = tbody.find_elements(By.TAG_NAME, "tr")
+            wait_for_datatable_redraw(driver, "example", None, previous_first_row=first_row, step="amgr.next_page")
+        except TimeoutException:
+            logger.warning(f"⚠️ No redraw after moving toward page {index + 1}; re-reading the pager.")
+        current = current_result_page(driver)
+        if current is None:
+            raise ParseError("AMGR pager shows no current page")
 
-            for row in rows:
-                cells = row.find_elements(By.TAG_NAME, "td")
-                if len(cells) >= 6:
-                    state = cells[1].text.strip()
-                    name = cells[2].text.strip()
-                    farm = cells[3].text.strip()
-                    phone = cells[4].text.strip()
-                    website = cells[5].text.strip()
 
-                    if simplified_expected:
-                        expected_words = re.findall(r"[a-z]+", simplified_expected)
-                        simplified_name = re.sub(r"[^a-z]", "", name.lower())
+def iter_result_pages(driver, expected_member_name=None, all_pages=True, start_page=0):
+    """Yield result pages from ``start_page`` on, retrying each page read and page turn on its own.
 
-                        if not any(word in simplified_name for word in expected_words) and not any(simplified_name in word for word in expected_words):
-                            continue
-
-
-                    all_data.append([state, name, farm, phone, website])
+    Errors that outlast the retries are raised instead of ending the walk
+    early, so callers never mistake a partial result for a complete one.
+    """
+    logger.info("⏳ Waiting for results table to load...")
+    wait = WebDriverWait(driver, 10)
 
-            next_btn = driver.find_element(By.ID, "example_next")
-            next_class = next_btn.get_attribute("class")
+    if all_pages and not start_page:
+        try:
+            wait.until(EC.presence_of_element_located((By.ID, "example")))
+            with span("extract_page", registry="amgr", engine="selenium"):
+                cell_rows = extract_all_pages(driver)
+            if cell_rows is not None:
+                yield count_page(result_rows(cell_rows, expected_member_name))
+                return
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read all pages at once ({e}).")
+        logger.info("➡️ Falling back to page-by-page extraction...")
 
-            if "disabled" in next_class:
-                print("🛑 Reached the last page.")
-                break
-            else:
-                print("➡️ Moving to next page...")
-                next_btn.click()
-                time.sleep(1)
+    index = start_page
+    if start_page:
+        logger.info(f"⏩ Resuming at page {start_page + 1}...")
+        show_result_page(driver, start_page)
+    while True:
+        page, last = retry_call(lambda: read_result_page(driver, wait, expected_member_name), site="amgr")
+        yield count_page(page)
 
-        except Exception as e:
-            print("❌ Error during pagination:")
-            traceback.print_exc()
+        if last:
+            logger.info("🛑 Reached the last page.")
             break
+        index += 1
+        logger.info("➡️ Moving to next page...")
+        show_result_page(driver, index)
 
-    print("\n📄 AMGR Directory Results:\n")
-    if all_data:
-        print(tabulate(all_data, headers=["State", "Name", "Farm", "Phone", "Website"], tablefmt="fancy_grid"))
-    else:
-        print("⚠️ No results found for the given member name.")
 
+def extract_table_data(driver, expected_member_name=None, all_pages=True):
+    all_data = [row for page in iter_result_pages(driver, expected_member_name, all_pages) for row in page]
+    print_results(all_data)
     return all_data
 
 
-def select_by_value(select_element, value):
-    if not value:
+def print_results(all_data):
+    with span("format", registry="amgr"):
+        print("\n📄 AMGR Directory Results:\n")
+        if all_data:
+            print(tabulate(all_data, headers=HEADERS, tablefmt="fancy_grid"))
+        else:
+            print("⚠️ No results found for the given member name.")
+
+
+def select_by_value(select_element, value, options):
+    if not value or not options.has_value(value):
+        if value:
+            logger.warning(f"⚠️ Value '{value}' not found in options. Selecting first option.")
         select_element.select_by_index(0)
         return
-    for option in select_element.options:
-        if option.get_attribute('value') == value:
-            select_element.select_by_value(value)
-            print(f"✅ Selected by value: {option.text} (value: {value})")
-            return
-    print(f"⚠️ Value '{value}' not found in options. Selecting first option.")
-    select_element.select_by_index(0)
-
-def select_option_by_text(select_element, target_text):
-    target_text_lower = target_text.strip().lower()
-
-    for option in select_element.options:
-        if option.text.strip().lower() == target_text_lower:
-            select_element.select_by_visible_text(option.text)
-            print(f"✅ Selected option by exact match: '{option.text}'")
-            return True
-
-    for option in select_element.options:
-        if target_text_lower in option.text.strip().lower():
-            select_element.select_by_visible_text(option.text)
-            print(f"✅ Selected option by partial match: '{option.text}'")
-            return True
-    print(f"⚠️ Could not find option matching '{target_text}'. Selecting first option.")
-    select_element.select_by_index(0)
-    return False
+    select_element.select_by_value(value)
+    logger.info(f"✅ Selected by value: {options.text_for(value)} (value: {value})")
+
+def select_option_by_text(select_element, target_text, options):
+    value = options.value_for(target_text)
+    if value is None:
+        logger.warning(f"⚠️ Could not find option matching '{target_text}'. Selecting first option.")
+        select_element.select_by_index(0)
+        return False
+    select_element.select_by_value(value)
+    logger.info(f"✅ Selected option: '{options.text_for(value)}'")
+    return True
 
 def find_best_member_match(member_partial, scrape_results):
     if not member_partial or not scrape_results:
         return None
-    names = [row["Name"] if isinstance(row, dict) else row for row in scrape_results if row]
-    matches = difflib.get_close_matches(member_partial, names, n=1, cutoff=0.6)
-    return matches[0] if matches else None
+    if isinstance(scrape_results, NameIndex):
+        return scrape_results.best(member_partial)
+    names = [
+        row["Name"] if isinstance(row, dict) else row[1] if isinstance(row, (list, Record)) else row
+        for row in scrape_results if row
+    ]
+    return NameIndex(names).best(member_partial)
+
+def scrape_amgr_directory(state="", breed_name=None, member_name=None, engine="http", client=None):
+    params = {"state": state, "breed_name": breed_name, "member_name": member_name}
+    try:
+        all_data = AmgrAdapter(client=client).search(params, engine)
+    except Exception as e:
+        logger.exception(f"❌ Error during scraping ({classify(e)}):")
+        return None
+    print_results(all_data)
+    return all_data
 
-def scrape_amgr_directory(state="", breed_name=None, member_name=None):
-    options = webdriver.ChromeOptions()
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--headless")
 
-    driver = None
+def capture_form_options(driver):
+    options = read_select_options(driver, FORM_SELECTS)
+    sync_breed_map(options.get("breedID", ()))
+    return options
 
-    try:
-        print("🚀 Launching browser...")
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        wait = WebDriverWait(driver, 15)
 
-        print("🌐 Navigating to AMGR directory...")
-        url = "https://www.amgr.org/frm_directorySearch.cfm"
+def fill_directory_form(driver, state="", breed_name=None, member_name=None):
+    wait = WebDriverWait(driver, 15)
+
+    logger.info("🌐 Navigating to AMGR directory...")
+    url = DIRECTORY_URL
+    with span("navigate", registry="amgr"):
         driver.get(url)
-        time.sleep(2)
+        wait_for_document_ready(driver, step="amgr.load_form")
 
-        print("🧪 Checking if page has iframe...")
+        logger.info("🧪 Checking if page has iframe...")
         iframes = driver.find_elements(By.TAG_NAME, "iframe")
         if len(iframes) > 0:
             driver.switch_to.frame(iframes[0])
 
-        print(f"📍 Selecting state: {state if state else '[ALL STATES]'}")
-        state_dropdown_el = wait.until(EC.presence_of_element_located((By.NAME, "stateID")))
-        state_dropdown = Select(state_dropdown_el)
+    with span("form_fill", registry="amgr"):
+        fill_form_fields(driver, wait, url, state, breed_name, member_name)
 
-        if state:
-            select_option_by_text(state_dropdown, state)
+    logger.info("🔘 Submitting the form...")
+    with span("submit", registry="amgr"):
+        submit_btn = wait.until(EC.element_to_be_clickable((By.ID, "submitButton")))
+        submit_btn.click()
+
+        timed_wait(driver, "amgr.submit", EC.any_of(
+            EC.staleness_of(submit_btn), EC.presence_of_element_located((By.ID, "example"))
+        ))
+        wait_for_document_ready(driver, step="amgr.results_ready")
+
+
+def fill_form_fields(driver, wait, url, state="", breed_name=None, member_name=None):
+
+    logger.info(f"📍 Selecting state: {state if state else '[ALL STATES]'}")
+    state_dropdown_el = wait.until(EC.presence_of_element_located((By.NAME, "stateID")))
+    state_dropdown = Select(state_dropdown_el)
+    options = option_cache.get(("amgr.selects", url), lambda: capture_form_options(driver))
+
+    if state:
+        select_option_by_text(state_dropdown, state, options["stateID"])
+    else:
+        state_dropdown.select_by_index(0)
+
+    logger.info(f"👤 Selecting member: {member_name if member_name else '[ALL MEMBERS]'}")
+    member_dropdown = Select(driver.find_element(By.NAME, "memberID"))
+
+    if member_name:
+        matching_members = match_member_options(options["memberID"].texts, member_name)
+
+        if len(matching_members) == 1:
+            member_dropdown.select_by_value(options["memberID"].value_for(matching_members[0], partial=False))
+            logger.info(f"✅ Selected member: '{matching_members[0]}'")
+        elif len(matching_members) > 1:
+            logger.warning(f"⚠️ Found multiple similar members for '{member_name}':")
+            for match in matching_members:
+                logger.warning(f"   → {match}")
+            logger.info("ℹ️ Please specify the full member name more precisely.")
+            member_dropdown.select_by_index(0)
         else:
-            state_dropdown.select_by_index(0)
-
-        print(f"👤 Selecting member: {member_name if member_name else '[ALL MEMBERS]'}")
-        member_dropdown_el = wait.until(EC.presence_of_element_located((By.NAME, "memberID")))
-        member_dropdown = Select(member_dropdown_el)
-
-        def clean_name(name):
-            return re.sub(r"\b(farm|farms|breeder|breeders|in|from)\b", "", name.lower()).strip()
-
-        if member_name:
-            simplified_input = clean_name(member_name)
-            matched = False
-            matching_members = []
-
-            for option in member_dropdown.options:
-                option_text = option.text.strip()
-                cleaned_option = clean_name(option_text)
-
-                if simplified_input in cleaned_option or cleaned_option in simplified_input:
-                    matching_members.append(option_text)
-
-
-            if len(matching_members) == 1:
-                member_dropdown.select_by_visible_text(matching_members[0])
-                print(f"✅ Selected member: '{matching_members[0]}'")
-                matched = True
-            elif len(matching_members) > 1:
-                print(f"⚠️ Found multiple similar members for '{member_name}':")
-                for match in matching_members:
-                    print(f"   → {match}")
-                print("ℹ️ Please specify the full member name more precisely.")
-                member_dropdown.select_by_index(0)
-            else:
-                print(f"⚠️ Could not find member '{member_name}'. Selecting all.")
-                member_dropdown.select_by_index(0)
+            logger.warning(f"⚠️ Could not find member '{member_name}'. Selecting all.")
+            member_dropdown.select_by_index(0)
 
 
-        print("🐐 Selecting breed...")
-        breed_dropdown_el = wait.until(EC.presence_of_element_located((By.NAME, "breedID")))
-        breed_dropdown = Select(breed_dropdown_el)
+    logger.info("🐐 Selecting breed...")
+    breed_dropdown = Select(driver.find_element(By.NAME, "breedID"))
 
-        breed_id = None
-        if breed_name:
-            breed_id = breed_map.get(breed_name)
-            if breed_id:
-                print(f"🔍 Interpreted breed: {breed_name} -> breedID = {breed_id}")
-            else:
-                print(f"⚠️ Breed '{breed_name}' not found in breed_map.")
+    breed_id = None
+    if breed_name:
+        breed_id = breed_map.get(breed_name)
+        if breed_id:
+            logger.info(f"🔍 Interpreted breed: {breed_name} -> breedID = {breed_id}")
         else:
-            print("ℹ️ No breed specified; selecting all.")
+            logger.warning(f"⚠️ Breed '{breed_name}' not found in breed_map.")
+    else:
+        logger.info("ℹ️ No breed specified; selecting all.")
 
-        select_by_value(breed_dropdown, breed_id)
+    select_by_value(breed_dropdown, breed_id, options["breedID"])
 
-        print("🔘 Submitting the form...")
-        submit_btn = wait.until(EC.element_to_be_clickable((By.ID, "submitButton")))
-        submit_btn.click()
 
-        time.sleep(2)
-        return extract_table_data(driver, expected_member_name=member_name)
+@register_adapter
+class AmgrAdapter(RegistryAdapter):
+    name = "amgr"
+    headers = HEADERS
+    record = AmgrRecord
 
+    def make_client(self, cache, **options):
+        return AmgrHttpClient(cache=cache, **options)
 
+    def parse(self, command, doc=None):
+        parsed = parse_command(command, doc=doc)
+        return {"state": parsed["state"], "breed_name": parsed["breed_name"], "member_name": parsed["member"]}
 
-    except Exception as e:
-        print("❌ Error during scraping:")
-        traceback.print_exc()
-        if driver:
+    def params_for(self, query):
+        return query.amgr_params()
+
+    def fetch_http(self, client, state=None, breed_name=None, member_name=None):
+        logger.info("🌐 Querying AMGR directory over HTTP...")
+        yield client.search(state or "", breed_name, member_name)
+
+    def fetch_selenium(self, driver, state=None, breed_name=None, member_name=None, start_page=0):
+        try:
+            fill_directory_form(driver, state or "", breed_name, member_name)
+            yield from iter_result_pages(driver, expected_member_name=member_name, start_page=start_page)
+        except Exception:
             with open("page_debug.html", "w", encoding="utf-8") as f:
                 f.write(driver.page_source)
+            raise
+
+    def resume(self, plan, engine, start_page):
+        if engine != "selenium":
+            return super().resume(plan, engine, start_page)
+        return self._fetch_leased(dict(plan.params, start_page=start_page))
+
+    def fetch_snapshot(self, query_engine, state=None, breed_name=None, member_name=None):
+        yield query_engine.amgr(state, breed_name, member_name)
+
+    def shards(self):
+        _, _, selects = self.client.form()
+        states = selects.get("stateID", ())[1:]
+        breeds = list(selects.get("breedID", ()))
+        return [
+            {"stateID": state_id, "breedID": breed_id, "breed": breed if index else None}
+            for _, state_id in states
+            for index, (breed, breed_id) in enumerate(breeds)
+        ]
+
+    def crawl_shard(self, stateID, breedID, breed=None):
+        action, _, _ = self.client.form()
+        data = dict(self.client.build_form_data(), stateID=stateID, breedID=breedID)
+        return [list(row) + [breed] for row in self.client.fetch_rows(action, data)]
+
+    def record_key(self, row):
+        return row[0], row[1]
+
+    def merge_shards(self, shard_rows):
+        members = {}
+        for rows in shard_rows:
+            for row in rows:
+                breeds = members.setdefault(tuple(row[:5]), set())
+                if row[5]:
+                    breeds.add(row[5])
+        return [list(row) + [sorted(breeds)] for row, breeds in members.items()]
+
 
-    finally:
-        if driver:
-            print("🧹 Closing browser...")
-            driver.quit()
+def iter_amgr_pages(state="", breed_name=None, member_name=None, engine="http", client=None, pool=None):
+    """Yield pages of AmgrRecord rows as soon as each one is parsed."""
+    params = {"state": state, "breed_name": breed_name, "member_name": member_name}
+    return AmgrAdapter(client=client, pool=pool).pages(params, engine)
+
+
+def iter_amgr_records(state="", breed_name=None, member_name=None, **kwargs):
+    return chain.from_iterable(iter_amgr_pages(state, breed_name, member_name, **kwargs))
 
 if __name__ == "__main__":
+    start_exporters()
     print("🔎 Welcome to the AMGR NLP Scraper!")
 
     while True:
@@ -324,12 +463,7 @@ if __name__ == "__main__":
         results = scrape_amgr_directory(state=state, breed_name=breed_name, member_name=member_name)
 
         if member_name and results:
-            dict_results = []
-            for r in results:
-                if len(r) >= 2:
-                    dict_results.append({"Name": r[1]})
-
-            best_match = find_best_member_match(member_name, dict_results)
+            best_match = find_best_member_match(member_name, results)
             if best_match:
                 print(f"\n🎯 Best matching member full name found: {best_match}")
             else:
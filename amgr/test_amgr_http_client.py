@@ -0,0 +1,105 @@
+import os
+import sys
+import threading
+import unittest
+
+import amgr_http_client
+from amgr_http_client import AmgrHttpClient, OptionList, parse_results_table, sync_breed_map
+from common.stub_server import StubServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class TestAmgrHttpClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        form_page = read_fixture("directory_form.html")
+        results_page = read_fixture("directory_results.html")
+
+        def directory(method, query, form):
+            return 200, results_page if method == "POST" else form_page
+
+        cls.server = StubServer({"/frm_directorySearch.cfm": directory}).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def make_client(self):
+        return AmgrHttpClient(url=self.server.base_url + "/frm_directorySearch.cfm")
+
+    def test_parse_results_table(self):
+        rows = parse_results_table(read_fixture("directory_results.html"))
+        self.assertEqual(rows[0], ["AL", "Hurlbert, John", "Hurlbert Farm", "(205) 555-0142", ""])
+        self.assertEqual(rows[1][2:], ["Lone Star Ranch", "(512) 555-0199", "lonestar.example"])
+        self.assertEqual(len(rows), 3)
+
+    def test_member_filter(self):
+        rows = parse_results_table(read_fixture("directory_results.html"), expected_member_name="Hurlbert")
+        self.assertEqual([row[1] for row in rows], ["Hurlbert, John"])
+
+    def test_form_data(self):
+        client = self.make_client()
+        data = client.build_form_data("Virginia", "(K) - Kiko", "Hurlbert")
+        self.assertEqual((data["stateID"], data["memberID"], data["breedID"]), ("46", "1187", "5"))
+        self.assertEqual(data["search"], "1")
+
+        data = client.build_form_data("", None, "Lone Star")
+        self.assertEqual((data["stateID"], data["memberID"], data["breedID"]), ("0", "0", "0"))
+
+    def test_search_posts_form(self):
+        rows = self.make_client().search("Texas", "(B) - Boer")
+        self.assertEqual(len(rows), 3)
+
+        method, path, _, form = self.server.requests[-1]
+        self.assertEqual((method, path), ("POST", "/frm_directorySearch.cfm"))
+        self.assertEqual((form["stateID"], form["breedID"]), ("43", "3"))
+
+    def test_breed_map_follows_live_options(self):
+        original = dict(amgr_http_client.breed_map)
+        self.addCleanup(lambda: (amgr_http_client.breed_map.clear(), amgr_http_client.breed_map.update(original)))
+        live = OptionList([("-- All Breeds --", "0"), ("(B) - Boer", "30"), ("(NB) - New Breed", "31")])
+        breeds = sync_breed_map(live)
+        self.assertEqual(breeds, {"(B) - Boer": "30", "(NB) - New Breed": "31"})
+        self.assertIs(breeds, amgr_http_client.breed_map)
+
+    def test_breed_map_sync_never_hides_live_breeds(self):
+        original = dict(amgr_http_client.breed_map)
+        self.addCleanup(lambda: (amgr_http_client.breed_map.clear(), amgr_http_client.breed_map.update(original)))
+        versions = [
+            OptionList([("(B) - Boer", "30"), ("(K) - Kiko", "5")]),
+            OptionList([("(B) - Boer", "30"), ("(NB) - New Breed", "31")]),
+        ]
+        stop, errors = threading.Event(), []
+
+        def read():
+            while not stop.is_set():
+                try:
+                    tuple(amgr_http_client.breed_map.items())
+                    if amgr_http_client.breed_map.get("(B) - Boer") is None:
+                        errors.append("Boer missing")
+                except RuntimeError as e:
+                    errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        reader = threading.Thread(target=read)
+        reader.start()
+        for round_ in range(2000):
+            sync_breed_map(versions[round_ % 2])
+        stop.set()
+        reader.join()
+        self.assertEqual(errors, [])
+        with self.assertNoLogs("scraper.amgr", level="WARNING"):
+            sync_breed_map(versions[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+import amgr_nlp_scraper
+from amgr_nlp_scraper import show_result_page
+from common.retry import ParseError
+
+
+class FakeElement:
+    def __init__(self, pager, text=""):
+        self.pager = pager
+        self.page = pager.page
+        self.text = text
+
+    def is_enabled(self):
+        if self.page != self.pager.page:
+            raise StaleElementReferenceException("redrawn")
+        return True
+
+    def click(self):
+        self.pager.clicks += 1
+        self.pager.page += 1
+
+
+class FakePager:
+    """A results table without a global DataTables API, paged only through its Next button."""
+
+    def __init__(self, page=0):
+        self.page = page
+        self.clicks = 0
+
+    def execute_script(self, script, *args):
+        return None
+
+    def find_elements(self, by, selector):
+        if "current" in selector:
+            return [FakeElement(self, str(self.page + 1))]
+        return [FakeElement(self)]
+
+    def find_element(self, by, value):
+        return FakeElement(self)
+
+
+class TestShowResultPage(unittest.TestCase):
+
+    def test_clicks_forward_to_an_absolute_page(self):
+        driver = FakePager()
+        show_result_page(driver, 3)
+        self.assertEqual((driver.page, driver.clicks), (3, 3))
+
+    def test_click_whose_redraw_timed_out_is_not_repeated(self):
+        driver = FakePager()
+        with mock.patch.object(amgr_nlp_scraper, "wait_for_datatable_redraw", side_effect=TimeoutException()):
+            show_result_page(driver, 1)
+        self.assertEqual((driver.page, driver.clicks), (1, 1))
+
+    def test_pager_past_the_target_raises(self):
+        with self.assertRaises(ParseError):
+            show_result_page(FakePager(page=4), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+import os
+import sys
+from importlib import import_module
+from itertools import chain, islice
+from typing import NamedTuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.driver_pool import get_pool
+from common.log import get_logger
+from common.metrics import incr
+from common.paths import ensure_registry_paths
+from common.records import Record
+from common.result_cache import get_result_cache
+from common.retry import classify, exhausted, should_retry
+
+logger = get_logger("adapters")
+
+ENGINE_FALLBACKS = {"http": ("http", "selenium"), "selenium": ("selenium",), "snapshot": ("snapshot",)}
+ADAPTER_MODULES = ("amgr_nlp_scraper", "shorthorn_nlp_scraper")
+
+ADAPTERS = {}
+
+
+class Plan(NamedTuple):
+    registry: str
+    params: dict
+    engines: tuple
+
+
+class RegistryAdapter:
+    """One breed registry behind the shared parse → plan → fetch → extract pipeline.
+
+    Subclasses supply what differs per site: search params for a command and
+    raw row pages from HTTP, a leased browser or the snapshot. Engine
+    fallback, driver leasing, the cached HTTP client and record extraction
+    live here once.
+    """
+
+    name = None
+    headers = ()
+    record = Record
+
+    def __init__(self, client=None, pool=None, query_engine=None):
+        self._client = client
+        self.pool = pool
+        self.query_engine = query_engine
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self.make_client(get_result_cache())
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    def make_client(self, cache, **options):
+        raise NotImplementedError
+
+    def parse(self, command, doc=None):
+        """Search params for ``command``, or None when it names nothing to search for."""
+        raise NotImplementedError
+
+    def params_for(self, query):
+        """Search params for a ParsedQuery from common.batch_parse, or None."""
+        raise NotImplementedError
+
+    def plan(self, params, engine="http"):
+        if engine not in ENGINE_FALLBACKS:
+            raise ValueError(f"Unknown engine '{engine}'; choose one of {', '.join(ENGINE_FALLBACKS)}")
+        return Plan(self.name, dict(params), ENGINE_FALLBACKS[engine])
+
+    def fetch(self, plan, engine):
+        """Iterator of raw row pages for ``plan`` from one engine."""
+        if engine == "snapshot":
+            query_engine = self.query_engine
+            if query_engine is None:
+                from common.snapshot import get_query_engine
+                query_engine = get_query_engine()
+            return self.fetch_snapshot(query_engine, **plan.params)
+        if engine == "selenium":
+            return self._fetch_leased(plan.params)
+        return self.fetch_http(self.client, **plan.params)
+
+    def _fetch_leased(self, params):
+        with (self.pool or get_pool()).lease() as driver:
+            yield from self.fetch_selenium(driver, **params)
+
+    def fetch_http(self, client, **params):
+        raise NotImplementedError
+
+    def fetch_selenium(self, driver, **params):
+        raise NotImplementedError
+
+    def fetch_snapshot(self, query_engine, **params):
+        raise NotImplementedError
+
+    def resume(self, plan, engine, start_page):
+        """Raw pages from ``start_page`` on. Adapters that can jump straight to a page override this."""
+        return islice(self.fetch(plan, engine), start_page, None)
+
+    def extract(self, rows):
+        return [row if isinstance(row, self.record) else self.record(*row) for row in rows]
+
+    def pages(self, params, engine="http"):
+        """Yield pages of records.
+
+        A transient error (see common.retry.classify) that no inner
+        ``retry_call`` has already retried resumes the same engine from the
+        first page not yet yielded, after a jittered backoff. An engine that
+        fails before its first page falls back to the next one; later
+        failures are raised rather than returning truncated results.
+        """
+        plan = self.plan(params, engine)
+        for index, engine in enumerate(plan.engines):
+            yielded = attempt = 0
+            pages = None
+            while True:
+                try:
+                    if pages is None:
+                        pages = self.resume(plan, engine, yielded) if yielded else self.fetch(plan, engine)
+                    page = next(pages)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    pages = None
+                    if not exhausted(e) and should_retry(self.name, e, attempt, trip=False):
+                        attempt += 1
+                        continue
+                    if yielded or index + 1 == len(plan.engines) or classify(e) == "circuit":
+                        raise
+                    logger.warning(
+                        f"⚠️ {self.name} {engine} search failed ({e}); falling back to {plan.engines[index + 1]}."
+                    )
+                    incr("fallbacks_total", registry=self.name)
+                    break
+                yielded += 1
+                attempt = 0
+                yield self.extract(page)
+
+    def records(self, params, engine="http"):
+        return chain.from_iterable(self.pages(params, engine))
+
+    def search(self, params, engine="http"):
+        return [list(record) for record in self.records(params, engine)]
+
+    def shards(self):
+        """Param dicts that together cover the whole directory, for common.crawl."""
+        raise NotImplementedError
+
+    def crawl_shard(self, **params):
+        """Every row of one shard, fetched over HTTP."""
+        raise NotImplementedError
+
+    def record_key(self, row):
+        """Identity of a merged row, so a change feed can tell an edit from an add and a remove."""
+        return tuple(row)
+
+    def merge_shards(self, shard_rows):
+        """Snapshot rows from the rows of every shard, without duplicates."""
+        seen = {}
+        for rows in shard_rows:
+            for row in rows:
+                seen.setdefault(tuple(row), list(row))
+        return list(seen.values())
+
+    def backend(self, engine="http"):
+        """Blocking ``backend(**params)`` callable for common.executor."""
+        def run(**params):
+            return self.search(params, engine)
+        return run
+
+
+def register_adapter(adapter_class):
+    ADAPTERS[adapter_class.name] = adapter_class
+    return adapter_class
+
+
+def load_adapters():
+    """Import the adapter modules, plus any listed in ``SCRAPER_ADAPTERS``, and return the registry."""
+    ensure_registry_paths()
+    extra = [name.strip() for name in os.environ.get("SCRAPER_ADAPTERS", "").split(",") if name.strip()]
+    for module in ADAPTER_MODULES + tuple(extra):
+        import_module(module)
+    return ADAPTERS
+
+
+def get_adapter(name, **kwargs):
+    adapter_class = load_adapters().get(name)
+    if adapter_class is None:
+        raise KeyError(f"No adapter for registry '{name}'")
+    return adapter_class(**kwargs)
+
+
+def all_adapters(**kwargs):
+    return {name: adapter_class(**kwargs) for name, adapter_class in load_adapters().items()}
+
+
+def run_command(command, registries=None, engine="http", fmt="table", **sink_kwargs):
+    """Parse ``command`` once per registry and stream each registry's pages into its own sink."""
+    from common.sinks import drain, make_sink
+
+    written = {}
+    for name, adapter in all_adapters().items():
+        if registries and name not in registries:
+            continue
+        params = adapter.parse(command)
+        if params is None:
+            logger.info(f"ℹ️ Nothing to search for in {name}.")
+            continue
+        logger.info(f"🔍 {name}: {params}")
+        written[name] = drain(adapter.pages(params, engine), make_sink(fmt, adapter.headers, **sink_kwargs))
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from common.metrics import start_exporters
+    from common.sinks import SINKS
+
+    parser = argparse.ArgumentParser(description="Run one command against every registered registry.")
+    parser.add_argument("command")
+    parser.add_argument("--registry", action="append", help="limit to these registries (repeatable)")
+    parser.add_argument("--engine", choices=list(ENGINE_FALLBACKS), default="http")
+    parser.add_argument("--format", choices=[name for name in SINKS if name != "parquet"], default="table")
+    args = parser.parse_args()
+
+    start_exporters()
+    run_command(args.command, args.registry, args.engine, args.format)
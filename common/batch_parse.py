@@ -0,0 +1,98 @@
+from collections import deque
+from itertools import chain
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from common.fast_parse import fast_parse
+from common.nlp_loader import get_nlp
+from common.paths import ensure_registry_paths
+
+
+class ParsedQuery(NamedTuple):
+    command: str
+    state: Optional[str]
+    breed_name: Optional[str]
+    member: Optional[str]
+    location: Optional[str]
+    city: str
+    member_name: str
+    t_param: Optional[str]
+
+    def amgr_params(self):
+        return {"state": self.state, "breed_name": self.breed_name, "member_name": self.member}
+
+
+def parse_doc(command: str, doc) -> ParsedQuery:
+    ensure_registry_paths()
+    from amgr_nlp_scraper import parse_command
+    from shorthorn_nlp_scraper import get_t_param, resolve_search_terms
+
+    amgr = parse_command(command, doc=doc)
+    terms = resolve_search_terms(command, doc=doc)
+    if terms is None:
+        location, city, member_name, t_param = None, "", "", None
+    else:
+        location, city, member_name = terms
+        t_param = get_t_param(location, city, member_name, command)
+
+    return ParsedQuery(
+        command=command,
+        state=amgr["state"],
+        breed_name=amgr["breed_name"],
+        member=amgr["member"],
+        location=location,
+        city=city,
+        member_name=member_name,
+        t_param=t_param,
+    )
+
+
+def parse_commands(commands: Iterable[str], batch_size: int = 256, n_process: int = 1, nlp=None) -> Iterator[ParsedQuery]:
+    """Parse many commands, in order, through one streaming ``nlp.pipe``.
+
+    Commands the rule-based fast path resolves never reach the model, and
+    the model is only loaded once a command needs it.
+    """
+    iterator = iter(commands)
+    for command in iterator:
+        if fast_parse(command) is None:
+            yield from _parse_streaming(chain([command], iterator), nlp or get_nlp(), batch_size, n_process)
+            return
+        yield parse_doc(command, None)
+
+
+def _parse_streaming(commands, nlp, batch_size, n_process):
+    waiting = deque()
+    docs = {}
+
+    def slow_commands():
+        for position, command in enumerate(commands):
+            slow = fast_parse(command) is None
+            waiting.append((position, command, slow))
+            if slow:
+                yield command, position
+
+    def ready():
+        while waiting and (not waiting[0][2] or waiting[0][0] in docs):
+            position, command, _ = waiting.popleft()
+            yield parse_doc(command, docs.pop(position, None))
+
+    for doc, position in nlp.pipe(slow_commands(), as_tuples=True, batch_size=batch_size, n_process=n_process):
+        docs[position] = doc
+        yield from ready()
+    yield from ready()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Parse a file of commands, one per line, into JSON lines.")
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        for query in parse_commands((line for line in lines if line), args.batch_size, args.n_process):
+            print(json.dumps(query._asdict()))
@@ -0,0 +1,310 @@
+import copy
+import json
+import math
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+
+from lxml import html
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.paths import ensure_registry_paths
+from common.stub_server import StubServer, paged_member_results
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+AMGR_FIXTURES = os.path.join(ROOT_DIR, "amgr", "fixtures")
+SHORTHORN_FIXTURES = os.path.join(ROOT_DIR, "shorthorn", "fixtures")
+
+COMMANDS = [
+    "Show all American Savanna breeders",
+    "Show all breeders in Texas",
+    "Show Savanna breeders in Texas",
+    "Show all members in Colorado",
+    "Show all Boer breeders in west virginia",
+    "search member name abby mill from alabama",
+    "search from virginia and jemison city",
+    "Show all breeders from all states",
+]
+
+
+class SkipScenario(Exception):
+    pass
+
+
+def read_fixture(directory, name):
+    with open(os.path.join(directory, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def scale_rows(page_html, row_xpath, factor):
+    """Repeat every row matched by ``row_xpath`` ``factor`` times to mimic a full directory."""
+    if factor <= 1:
+        return page_html
+    tree = html.fromstring(page_html)
+    for row in tree.xpath(row_xpath):
+        for _ in range(factor - 1):
+            row.addnext(copy.deepcopy(row))
+    return html.tostring(tree, encoding="unicode")
+
+
+def reset_peak_rss():
+    """Restart the kernel's RSS high-water mark (Linux); False where that isn't possible.
+
+    ``ru_maxrss`` only ever grows for the life of a process (and is inherited
+    by spawned children), so without a reset every scenario after the first
+    would report the largest peak seen so far.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of already sorted samples."""
+    rank = math.ceil(pct / 100 * len(sorted_samples))
+    return sorted_samples[min(len(sorted_samples), max(rank, 1)) - 1]
+
+
+def measure(fn, iterations=100, warmup=3):
+    """Latency percentiles (ms), throughput and peak RSS for ``iterations`` calls of ``fn``.
+
+    ``peak_rss_kb`` is None where the high-water mark can't be reset per scenario.
+    """
+    isolated = reset_peak_rss()
+    for _ in range(warmup):
+        fn()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        begin = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p95_ms": round(percentile(samples, 95) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+        "mean_ms": round(elapsed / iterations * 1000, 4),
+        "ops_per_s": round(iterations / elapsed, 2) if elapsed else None,
+        "peak_rss_kb": peak_rss_kb() if isolated else None,
+    }
+
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def decorator(factory):
+        SCENARIOS[name] = contextmanager(factory)
+        return factory
+    return decorator
+
+
+@contextmanager
+def amgr_server(scale):
+    form_page = read_fixture(AMGR_FIXTURES, "directory_form.html")
+    results_page = scale_rows(
+        read_fixture(AMGR_FIXTURES, "directory_results.html"), "//table[@id='example']/tbody/tr", scale
+    )
+
+    def directory(method, query, form):
+        return 200, results_page if method == "POST" else form_page
+
+    with StubServer({"/frm_directorySearch.cfm": directory}) as server:
+        yield server
+
+
+@contextmanager
+def shorthorn_server(scale):
+    ensure_registry_paths()
+    from shorthorn_http_client import SEARCH_RESULTS_PATH
+
+    fragment = scale_rows(
+        read_fixture(SHORTHORN_FIXTURES, "search_results_ranch.html"), "//tr[starts-with(@id, 'tr_')]", scale
+    )
+    routes = {"/": os.path.join(SHORTHORN_FIXTURES, "landing.html"), SEARCH_RESULTS_PATH: fragment}
+    with StubServer(routes) as server:
+        yield server
+
+
+@scenario("parse.fast")
+def _parse_fast(scale):
+    from common.fast_parse import fast_parse
+
+    yield lambda: [fast_parse(command) for command in COMMANDS]
+
+
+@scenario("parse.batch")
+def _parse_batch(scale):
+    from common.batch_parse import parse_commands
+    from common.parse_cache import parse_cache
+
+    def run():
+        parse_cache.clear()
+        try:
+            return list(parse_commands(COMMANDS))
+        except OSError as e:
+            raise SkipScenario(f"spaCy model unavailable: {e}")
+
+    yield run
+
+
+@scenario("extract.amgr")
+def _extract_amgr(scale):
+    ensure_registry_paths()
+    from amgr_http_client import RESULT_ROWS_XPATH, parse_results_table
+
+    page = scale_rows(read_fixture(AMGR_FIXTURES, "directory_results.html"), RESULT_ROWS_XPATH, scale)
+    yield lambda: parse_results_table(page)
+
+
+@scenario("extract.shorthorn")
+def _extract_shorthorn(scale):
+    ensure_registry_paths()
+    from shorthorn_http_client import RESULT_ROWS_XPATH, parse_result_rows
+
+    fragment = scale_rows(read_fixture(SHORTHORN_FIXTURES, "search_results_ranch.html"), RESULT_ROWS_XPATH, scale)
+    yield lambda: parse_result_rows(fragment)
+
+
+@scenario("paginate.shorthorn")
+def _paginate_shorthorn(scale, pages=5):
+    ensure_registry_paths()
+    from shorthorn_http_client import SEARCH_RESULTS_PATH, ShorthornHttpClient, build_search_params
+
+    routes = {
+        "/": os.path.join(SHORTHORN_FIXTURES, "landing.html"),
+        SEARCH_RESULTS_PATH: paged_member_results(total=pages * scale, page_size=scale),
+    }
+    with StubServer(routes) as server:
+        client = ShorthornHttpClient(base_url=server.base_url)
+        _, selected_value = client.resolve_location("United States")
+        params = build_search_params(selected_value, "", "", "897")
+        yield lambda: [row for page in client.iter_pages(params) for row in page]
+
+
+@scenario("e2e.amgr")
+def _e2e_amgr(scale):
+    ensure_registry_paths()
+    from amgr_http_client import AmgrHttpClient
+    from common.option_cache import OptionCache
+
+    with amgr_server(scale) as server:
+        url = server.base_url + "/frm_directorySearch.cfm"
+        yield lambda: AmgrHttpClient(url=url, options=OptionCache(ttl=0)).search("Texas", "(B) - Boer")
+
+
+@scenario("e2e.shorthorn")
+def _e2e_shorthorn(scale):
+    ensure_registry_paths()
+    from shorthorn_http_client import ShorthornHttpClient
+    from common.option_cache import OptionCache
+
+    with shorthorn_server(scale) as server:
+        yield lambda: ShorthornHttpClient(base_url=server.base_url, options=OptionCache(ttl=0)).search(
+            "Texas", "", "", "574"
+        )
+
+
+def run_benchmarks(names=None, iterations=100, scale=50, warmup=3):
+    results = {}
+    for name in names or SCENARIOS:
+        with SCENARIOS[name](scale) as fn:
+            try:
+                results[name] = measure(fn, iterations, warmup)
+            except SkipScenario as e:
+                print(f"⏭️ Skipping {name}: {e}")
+    return results
+
+
+def compare(results, baseline, tolerance=0.25, metric="p95_ms"):
+    """Scenarios whose ``metric`` is more than ``tolerance`` slower than the baseline."""
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name, {}).get(metric)
+        if previous and stats[metric] > previous * (1 + tolerance):
+            regressions.append(f"{name}: {metric} {stats[metric]} > {previous} (+{tolerance:.0%})")
+    return regressions
+
+
+def save_baseline(path, results, iterations, scale):
+    payload = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "scale": scale,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from tabulate import tabulate
+
+    parser = argparse.ArgumentParser(description="Benchmark parsing, extraction and scraping against recorded fixtures.")
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--scale", type=int, default=50, help="repeat each fixture row this many times")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="fail if slower than this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--metric", default="p95_ms")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.scenarios or None, args.iterations, args.scale)
+    columns = ["p50_ms", "p95_ms", "p99_ms", "ops_per_s", "peak_rss_kb"]
+    print(tabulate([[name] + [stats[c] for c in columns] for name, stats in results.items()],
+                   headers=["scenario"] + columns, tablefmt="github"))
+
+    if args.save:
+        save_baseline(args.save, results, args.iterations, args.scale)
+        print(f"💾 Baseline saved to {args.save}")
+    if args.compare:
+        regressions = compare(results, load_baseline(args.compare), args.tolerance, args.metric)
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against baseline.")
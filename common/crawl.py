@@ -0,0 +1,399 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import NamedTuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.adapters import load_adapters
+from common.http_session import HostRateLimiter, throttle
+from common.log import get_logger
+from common.metrics import incr, span
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "nlp-scraping", "crawl.sqlite3")
+DEFAULT_RATE = float(os.environ.get("SCRAPER_CRAWL_RATE", "2"))
+DEFAULT_MIN_INTERVAL = 6 * 3600
+DEFAULT_MAX_INTERVAL = 7 * 24 * 3600
+CHURN_WEIGHT = 0.3
+
+logger = get_logger("crawl")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_shards (
+    crawl TEXT, registry TEXT, shard TEXT, rows TEXT, completed_at REAL,
+    PRIMARY KEY (crawl, registry, shard)
+);
+CREATE TABLE IF NOT EXISTS shard_history (
+    registry TEXT, shard TEXT, digest TEXT, rows TEXT, checked_at REAL, churn REAL,
+    PRIMARY KEY (registry, shard)
+);
+"""
+
+
+class Shard(NamedTuple):
+    registry: str
+    key: str
+    params: dict
+
+
+def shard_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+class CrawlCheckpoint:
+    """Rows of every completed shard, so an interrupted crawl resumes where it stopped."""
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH, crawl="full"):
+        self.path = path
+        self.crawl = crawl
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def completed(self, registry):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT shard, rows FROM crawl_shards WHERE crawl = ? AND registry = ?", (self.crawl, registry)
+            ).fetchall()
+        return {key: json.loads(payload) for key, payload in rows}
+
+    def record(self, registry, key, rows):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO crawl_shards VALUES (?, ?, ?, ?, ?)",
+                (self.crawl, registry, key, json.dumps(rows), time.time()),
+            )
+
+    def clear(self, registry):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM crawl_shards WHERE crawl = ? AND registry = ?", (self.crawl, registry))
+
+
+class ShardEntry(NamedTuple):
+    digest: str
+    rows: list
+    checked_at: float
+    churn: float
+
+
+class ShardHistory:
+    """Last digest, rows and churn of every shard, kept between incremental refreshes.
+
+    Churn is an exponentially weighted share of checks that found the shard
+    changed, from 0 (never changes) to 1 (changes every time).
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def entries(self, registry):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT shard, digest, rows, checked_at, churn FROM shard_history WHERE registry = ?", (registry,)
+            ).fetchall()
+        return {key: ShardEntry(digest, json.loads(payload), checked_at, churn)
+                for key, digest, payload, checked_at, churn in rows}
+
+    def update(self, registry, key, digest, rows, changed, checked_at):
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT churn FROM shard_history WHERE registry = ? AND shard = ?", (registry, key)
+            ).fetchone()
+            churn = 1.0 if row is None else (1 - CHURN_WEIGHT) * row[0] + CHURN_WEIGHT * changed
+            self.conn.execute(
+                "INSERT OR REPLACE INTO shard_history VALUES (?, ?, ?, ?, ?, ?)",
+                (registry, key, digest, json.dumps(rows), checked_at, churn),
+            )
+        return ShardEntry(digest, rows, checked_at, churn)
+
+
+_worker_adapters = None
+
+
+def crawl_adapter(adapter_class, limiter, client_options=None):
+    """An adapter whose uncached HTTP client goes through ``limiter``."""
+    adapter = adapter_class()
+    adapter.client = adapter.make_client(None, **(client_options or {}).get(adapter.name, {}))
+    throttle(adapter.client.session, limiter)
+    return adapter
+
+
+def _init_worker(limiter, client_options):
+    global _worker_adapters
+    _worker_adapters = {
+        name: crawl_adapter(adapter_class, limiter, client_options) for name, adapter_class in load_adapters().items()
+    }
+
+
+def _run_shard(shard):
+    with span("crawl_shard", registry=shard.registry):
+        return _worker_adapters[shard.registry].crawl_shard(**shard.params)
+
+
+@contextmanager
+def _crawl_session(registries, rate, client_options):
+    adapter_classes = load_adapters()
+    registries = list(registries or adapter_classes)
+    with multiprocessing.Manager() as manager:
+        limiter = HostRateLimiter(rate, manager.dict(), manager.Lock())
+        yield {name: crawl_adapter(adapter_classes[name], limiter, client_options) for name in registries}, limiter
+
+
+def enumerate_shards(name, adapter):
+    return [Shard(name, shard_key(params), params) for params in adapter.shards()]
+
+
+def run_shards(shards, workers, limiter, client_options, finish):
+    """Fetch ``shards`` on a process pool, calling ``finish(shard, rows, error)`` in the parent as each ends."""
+    if workers <= 1:
+        _init_worker(limiter, client_options)
+        for shard in shards:
+            try:
+                finish(shard, _run_shard(shard), None)
+            except Exception as e:
+                finish(shard, None, e)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(limiter, client_options)) as pool:
+        futures = {pool.submit(_run_shard, shard): shard for shard in shards}
+        for future in as_completed(futures):
+            try:
+                finish(futures[future], future.result(), None)
+            except Exception as e:
+                finish(futures[future], None, e)
+
+
+def crawl(registries=None, workers=None, rate=DEFAULT_RATE, checkpoint=None, store=None, client_options=None,
+          history=None):
+    """Crawl every shard of each registry over a process pool and merge the results.
+
+    Shards come from each adapter's cached dropdown options. Each worker
+    process keeps its own HTTP session; all of them share one per-host rate
+    limit. Finished shards are written to ``checkpoint`` as they complete, and
+    a registry is merged (and written to ``store`` when given) only once all
+    of its shards are done. Each finished shard also seeds ``history`` (a
+    ShardHistory) so the next incremental refresh starts from this crawl.
+    ``client_options`` maps a registry to extra keyword arguments for its
+    HTTP client. Returns ``{registry: {"shards", "failed", "rows"}}``.
+    """
+    with _crawl_session(registries, rate, client_options) as (adapters, limiter):
+        done, pending = {}, []
+        for name, adapter in adapters.items():
+            done[name] = checkpoint.completed(name) if checkpoint else {}
+            shards = enumerate_shards(name, adapter)
+            pending.extend(shard for shard in shards if shard.key not in done[name])
+            logger.info(f"🧭 {name}: {len(shards)} shards, {len(shards) - len(done[name])} to crawl")
+
+        failed = {name: [] for name in adapters}
+
+        def finish(shard, rows, error):
+            if error is not None:
+                logger.warning(f"⚠️ Shard {shard.registry} {shard.key} failed: {error}")
+                failed[shard.registry].append(shard.key)
+                incr("crawl_shards_total", registry=shard.registry, status="error")
+                return
+            done[shard.registry][shard.key] = rows
+            if checkpoint:
+                checkpoint.record(shard.registry, shard.key, rows)
+            if history is not None:
+                history.update(shard.registry, shard.key, shard_digest(rows), rows, False, time.time())
+            incr("crawl_shards_total", registry=shard.registry, status="ok")
+
+        run_shards(pending, workers or os.cpu_count() or 1, limiter, client_options, finish)
+
+    report = {}
+    for name, adapter in adapters.items():
+        rows = None
+        if not failed[name]:
+            rows = adapter.merge_shards(done[name][key] for key in sorted(done[name]))
+            if store is not None:
+                getattr(store, f"replace_{name}")(rows)
+            if checkpoint:
+                checkpoint.clear(name)
+        report[name] = {"shards": len(done[name]) + len(failed[name]), "failed": failed[name],
+                        "rows": None if rows is None else len(rows)}
+    return report
+
+
+def shard_digest(rows):
+    """Order-independent hash of one shard's rows."""
+    digest = hashlib.sha256()
+    for line in sorted(json.dumps(row) for row in rows):
+        digest.update(line.encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+def diff_rows(adapter, previous, current):
+    """``(op, key, record, previous)`` for every added, removed or changed record, keyed by ``record_key``."""
+    before = {adapter.record_key(row): row for row in previous}
+    after = {adapter.record_key(row): row for row in current}
+    changes = []
+    for key, row in after.items():
+        if key not in before:
+            changes.append(("added", key, row, None))
+        elif before[key] != row:
+            changes.append(("changed", key, row, before[key]))
+    for key, row in before.items():
+        if key not in after:
+            changes.append(("removed", key, None, row))
+    return changes
+
+
+def refresh_interval(churn, min_interval, max_interval):
+    """Shards that always change are rechecked every ``min_interval``; quiet ones every ``max_interval``."""
+    return min_interval + (max_interval - min_interval) * (1 - churn)
+
+
+def due_shards(shards, history, now, min_interval, max_interval, limit=None):
+    """Shards whose refresh interval has passed, most volatile and then stalest first."""
+    due = []
+    for shard in shards:
+        entry = history.get(shard.key)
+        if entry is None:
+            due.append((2.0, 0.0, shard))
+        elif now - entry.checked_at >= refresh_interval(entry.churn, min_interval, max_interval):
+            due.append((entry.churn, entry.checked_at, shard))
+    due.sort(key=lambda item: (-item[0], item[1]))
+    return [shard for _, _, shard in due[:limit]]
+
+
+def refresh(history, registries=None, workers=None, rate=DEFAULT_RATE, store=None, client_options=None, feed=None,
+            min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL, limit=None, now=None):
+    """Incrementally refresh due shards and emit a change feed instead of a full dump.
+
+    Each fetched shard is hashed and compared with its last digest in
+    ``history``. Registries where a digest moved are re-merged and diffed
+    record by record, and each added, removed or changed record is written
+    to ``feed`` as one JSON line. A shard's churn (how often its digest
+    moves) shortens its refresh interval, so busy states are rechecked more
+    often than quiet ones.
+
+    Until ``history`` holds every current shard (a first run, ``limit``, or
+    failed new shards) the store and the feed are left alone, since a merge
+    of the shards seen so far would drop the rest. Once it does, records are
+    diffed against the stored snapshot if the previous history was still
+    incomplete. Returns ``{registry: {"checked", "changed", "failed", "changes", "pending"}}``,
+    ``pending`` being the shards not seen yet.
+    """
+    now = time.time() if now is None else now
+    with _crawl_session(registries, rate, client_options) as (adapters, limiter):
+        entries, previous, keys, pending = {}, {}, {}, []
+        report = {name: {"checked": 0, "changed": 0, "failed": 0, "changes": 0, "pending": 0} for name in adapters}
+        for name, adapter in adapters.items():
+            entries[name] = history.entries(name)
+            previous[name] = dict(entries[name])
+            shards = enumerate_shards(name, adapter)
+            keys[name] = sorted(shard.key for shard in shards)
+            due = due_shards(shards, entries[name], now, min_interval, max_interval, limit)
+            pending.extend(due)
+            logger.info(f"🧭 {name}: {len(due)} of {len(shards)} shards due")
+
+        def finish(shard, rows, error):
+            summary = report[shard.registry]
+            if error is not None:
+                logger.warning(f"⚠️ Shard {shard.registry} {shard.key} failed: {error}")
+                summary["failed"] += 1
+                incr("crawl_shards_total", registry=shard.registry, status="error")
+                return
+            incr("crawl_shards_total", registry=shard.registry, status="ok")
+            summary["checked"] += 1
+            digest = shard_digest(rows)
+            entry = entries[shard.registry].get(shard.key)
+            changed = entry is None or entry.digest != digest
+            summary["changed"] += changed
+            entries[shard.registry][shard.key] = history.update(
+                shard.registry, shard.key, digest, rows, changed and entry is not None, now
+            )
+
+        run_shards(pending, workers or os.cpu_count() or 1, limiter, client_options, finish)
+
+    for name, adapter in adapters.items():
+        missing = [key for key in keys[name] if key not in entries[name]]
+        if missing:
+            report[name]["pending"] = len(missing)
+            logger.warning(f"⏳ {name}: {len(missing)} shards not checked yet; keeping the snapshot as it is")
+            continue
+        if not report[name]["changed"]:
+            continue
+        if all(key in previous[name] for key in keys[name]) or store is None:
+            before = adapter.merge_shards(previous[name][key].rows for key in keys[name] if key in previous[name])
+        else:
+            before = getattr(store, f"{name}_rows")()
+        after = adapter.merge_shards(entries[name][key].rows for key in keys[name])
+        changes = diff_rows(adapter, before, after)
+        for op, key, record, old in changes:
+            incr("changes_total", registry=name, op=op)
+            if feed is not None:
+                feed.write(json.dumps({
+                    "registry": name, "op": op, "key": key, "record": record, "previous": old, "ts": round(now, 3),
+                }, default=sorted) + "\n")
+        report[name]["changes"] = len(changes)
+        if store is not None:
+            getattr(store, f"replace_{name}")(after)
+    if feed is not None:
+        feed.flush()
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from common.metrics import start_exporters
+    from common.snapshot import DEFAULT_PATH, SnapshotStore
+
+    parser = argparse.ArgumentParser(description="Refresh the full-directory snapshot with a sharded, resumable crawl.")
+    parser.add_argument("--registry", action="append", help="limit to these registries (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="requests per second per host")
+    parser.add_argument("--db", default=os.environ.get("SCRAPER_SNAPSHOT_PATH", DEFAULT_PATH))
+    parser.add_argument("--checkpoint", default=os.environ.get("SCRAPER_CRAWL_CHECKPOINT", DEFAULT_CHECKPOINT_PATH))
+    parser.add_argument("--crawl-id", default="full", help="name of the crawl to resume")
+    parser.add_argument("--incremental", action="store_true", help="refresh only due shards and emit a change feed")
+    parser.add_argument("--feed", default="changes.ndjson", help="file to append change-feed JSON lines to")
+    parser.add_argument("--limit", type=int, help="check at most this many shards per registry")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL / 3600, help="hours")
+    parser.add_argument("--max-interval", type=float, default=DEFAULT_MAX_INTERVAL / 3600, help="hours")
+    args = parser.parse_args()
+
+    start_exporters()
+    started = time.time()
+    if args.incremental:
+        with open(args.feed, "a", encoding="utf-8") as feed:
+            report = refresh(
+                ShardHistory(args.checkpoint), args.registry, args.workers, args.rate, SnapshotStore(args.db),
+                feed=feed, min_interval=args.min_interval * 3600, max_interval=args.max_interval * 3600,
+                limit=args.limit,
+            )
+        for name, summary in report.items():
+            print(f"🔁 {name}: {summary['checked']} shards checked, {summary['changed']} changed, "
+                  f"{summary['changes']} record changes, {summary['failed']} failed, "
+                  f"{summary['pending']} not seen yet")
+        print(f"⏱️ Refresh finished in {time.time() - started:.1f}s")
+        sys.exit(1 if any(summary["failed"] for summary in report.values()) else 0)
+
+    report = crawl(args.registry, args.workers, args.rate, CrawlCheckpoint(args.checkpoint, args.crawl_id),
+                   SnapshotStore(args.db), history=ShardHistory(args.checkpoint))
+    for name, summary in report.items():
+        if summary["failed"]:
+            print(f"⚠️ {name}: {len(summary['failed'])} of {summary['shards']} shards failed; rerun to resume.")
+        else:
+            print(f"✅ {name}: {summary['rows']} rows from {summary['shards']} shards")
+    print(f"⏱️ Crawl finished in {time.time() - started:.1f}s")
+    if any(summary["failed"] for summary in report.values()):
+        sys.exit(1)
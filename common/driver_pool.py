@@ -0,0 +1,216 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from selenium import webdriver
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from common.log import get_logger
+from common.metrics import incr, span
+
+logger = get_logger("driver_pool")
+
+
+@lru_cache(maxsize=None)
+def resolve_driver_path():
+    return ChromeDriverManager().install()
+
+
+def chrome_options():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def launch_chrome():
+    return webdriver.Chrome(service=Service(resolve_driver_path()), options=chrome_options())
+
+
+def process_tree_rss_kb(pid):
+    """Resident memory of ``pid`` and its descendants, read from /proc (Linux only)."""
+    total = 0
+    pending = [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+                        break
+            for task in os.listdir(f"/proc/{current}/task"):
+                try:
+                    with open(f"/proc/{current}/task/{task}/children") as f:
+                        pending.extend(int(child) for child in f.read().split())
+                except OSError:
+                    continue
+    except (OSError, ValueError):
+        return None
+    return total
+
+
+def driver_rss_kb(driver):
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None:
+        return None
+    return process_tree_rss_kb(process.pid)
+
+
+class PooledDriver:
+    __slots__ = ("driver", "uses", "baseline_rss_kb")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.baseline_rss_kb = driver_rss_kb(driver)
+
+
+class DriverPool:
+    """Keeps up to ``size`` warm browser sessions and leases them per query.
+
+    Sessions are reset between leases instead of being relaunched, and are
+    recycled after ``max_uses`` leases or once their memory grows by more than
+    ``max_memory_growth_mb`` over the size measured at launch.
+    """
+
+    def __init__(self, size=2, max_uses=50, max_memory_growth_mb=300, factory=launch_chrome,
+                 reset_url="about:blank"):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_memory_growth_kb = max_memory_growth_mb * 1024 if max_memory_growth_mb else None
+        self.factory = factory
+        self.reset_url = reset_url
+        self._idle = []
+        # Guards _idle and _created together; notified whenever a session is
+        # returned or discarded, since either frees room for a waiter.
+        self._available = threading.Condition()
+        self._created = 0
+        self._closed = False
+
+    def _acquire(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a free browser session")
+                self._available.wait(remaining)
+
+        logger.info("🚀 Launching browser...")
+        try:
+            with span("driver_launch"):
+                pooled = PooledDriver(self.factory())
+            incr("driver_launches_total")
+            return pooled
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+
+    def _discard(self, pooled, reason="recycled"):
+        incr("driver_discards_total", reason=reason)
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def is_healthy(self, pooled):
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def needs_recycle(self, pooled):
+        if self.max_uses and pooled.uses >= self.max_uses:
+            return True
+        if self.max_memory_growth_kb and pooled.baseline_rss_kb is not None:
+            current = driver_rss_kb(pooled.driver)
+            if current is not None and current - pooled.baseline_rss_kb > self.max_memory_growth_kb:
+                return True
+        return False
+
+    def reset(self, driver):
+        driver.switch_to.default_content()
+        driver.delete_all_cookies()
+        driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        driver.get(self.reset_url)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        with span("driver_acquire"):
+            while True:
+                pooled = self._acquire(timeout)
+                if self.is_healthy(pooled):
+                    break
+                logger.warning("♻️ Discarding unresponsive browser session.")
+                self._discard(pooled, "unhealthy")
+
+        broken = False
+        try:
+            yield pooled.driver
+        except (TimeoutException, StaleElementReferenceException):
+            # The page was slow or re-rendered; the browser itself is still usable.
+            raise
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            pooled.uses += 1
+            self._release(pooled, broken)
+
+    def _release(self, pooled, broken):
+        if not broken:
+            try:
+                self.reset(pooled.driver)
+            except WebDriverException:
+                broken = True
+
+        if broken or self._closed or self.needs_recycle(pooled):
+            self._discard(pooled, "broken" if broken else "closed" if self._closed else "recycled")
+        else:
+            with self._available:
+                self._idle.append(pooled)
+                self._available.notify()
+
+    def close(self):
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for pooled in idle:
+            self._discard(pooled, "closed")
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_pool(**kwargs):
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            size = int(os.environ.get("SCRAPER_DRIVER_POOL_SIZE", "2"))
+            _shared_pool = DriverPool(**{"size": size, **kwargs})
+            atexit.register(_shared_pool.close)
+        return _shared_pool
@@ -0,0 +1,141 @@
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+from common.adapters import all_adapters
+from common.log import get_logger
+from common.metrics import incr, observe, start_exporters
+
+DEFAULT_LIMITS = {"amgr": 4, "shorthorn": 4}
+
+logger = get_logger("executor")
+
+
+class Job(NamedTuple):
+    registry: str
+    params: dict
+
+
+class QueryResult(NamedTuple):
+    job: Job
+    rows: Optional[list]
+    error: Optional[BaseException]
+    elapsed: float
+
+
+def jobs_for(query, registries=None):
+    """Jobs for one ParsedQuery from common.batch_parse, for every registry unless limited."""
+    adapters = all_adapters()
+    jobs = []
+    for registry in registries or adapters:
+        params = adapters[registry].params_for(query) if registry in adapters else None
+        if params is not None:
+            jobs.append(Job(registry, params))
+    return jobs
+
+
+def adapter_backends(engine="http"):
+    """One backend per registered RegistryAdapter, each sharing its HTTP client across jobs."""
+    return {name: adapter.backend(engine) for name, adapter in all_adapters().items()}
+
+
+def http_backends():
+    return adapter_backends("http")
+
+
+def selenium_backends():
+    return adapter_backends("selenium")
+
+
+class QueryExecutor:
+    """Fans jobs out across registry backends with a concurrency limit per site.
+
+    A backend is either a coroutine function, awaited directly, or a blocking
+    callable such as the Selenium flows, which runs on a shared thread pool.
+    """
+
+    def __init__(self, backends=None, limits=None, max_workers=8):
+        self.backends = backends if backends is not None else http_backends()
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._semaphores = {}
+        self._loop = None
+
+    def _semaphore(self, registry):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {}
+        if registry not in self._semaphores:
+            self._semaphores[registry] = asyncio.Semaphore(self.limits.get(registry, 1))
+        return self._semaphores[registry]
+
+    async def run_job(self, job: Job) -> QueryResult:
+        backend = self.backends.get(job.registry)
+        started = time.perf_counter()
+        if backend is None:
+            return QueryResult(job, None, KeyError(f"No backend for registry '{job.registry}'"), 0.0)
+
+        async with self._semaphore(job.registry):
+            try:
+                if inspect.iscoroutinefunction(backend):
+                    rows = await backend(**job.params)
+                else:
+                    loop = asyncio.get_running_loop()
+                    rows = await loop.run_in_executor(self._pool, lambda: backend(**job.params))
+                result = QueryResult(job, rows, None, time.perf_counter() - started)
+            except Exception as e:
+                result = QueryResult(job, None, e, time.perf_counter() - started)
+        status = "ok" if result.error is None else "error"
+        observe("stage_seconds", result.elapsed, stage="job", registry=job.registry, status=status)
+        incr("jobs_total", registry=job.registry, status=status)
+        return result
+
+    async def run_blocking(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def stream(self, jobs):
+        """Yield a QueryResult for each job as soon as it completes."""
+        tasks = [asyncio.ensure_future(self.run_job(job)) for job in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def run(self, jobs):
+        async def collect():
+            return [result async for result in self.stream(jobs)]
+        return asyncio.run(collect())
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from tabulate import tabulate
+
+    from common.batch_parse import parse_commands
+
+    start_exporters()
+    commands = sys.argv[1:] or [line.strip() for line in sys.stdin if line.strip()]
+    jobs = [job for query in parse_commands(commands) for job in jobs_for(query)]
+    executor = QueryExecutor()
+
+    async def main():
+        async for result in executor.stream(jobs):
+            print(f"\n📄 {result.job.registry} {result.job.params} ({result.elapsed:.2f}s)")
+            if result.error is not None:
+                print(f"❌ {result.error}")
+            else:
+                print(tabulate(result.rows, tablefmt="github"))
+
+    try:
+        asyncio.run(main())
+    finally:
+        executor.close()
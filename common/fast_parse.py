@@ -0,0 +1,114 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from common.gazetteer import REGIONS, region_name
+from common.paths import ensure_registry_paths
+
+TEMPLATE_WORDS = frozenset("""
+a all an and any are at breed breeder breeders breeds city country entire everywhere farm farms find for from
+get goat goats give in is list located look me member members name near nationwide of on please ranch ranches
+raise raising registered registry search show state states the their them to united us who with
+""".split())
+
+MEMBER_NAME = re.compile(r"\bmember name\b")
+LOCATION_WORDS = (" from ", " in ", " near ", " at ")
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+class FastParse(NamedTuple):
+    state: Optional[str]
+    city: str
+    member_name: str
+    breed_name: Optional[str]
+
+
+def city_from_command(lower_command):
+    """The word next to "city", as the original Shorthorn rule reads it, or ""."""
+    if "city" not in lower_command:
+        return ""
+    for part in reversed(lower_command.split("city")):
+        tokens = part.strip().split()
+        if tokens:
+            return tokens[-1]
+    return ""
+
+
+def member_name_from_command(lower_command):
+    """Text after "member name", cut at the first location word, or None when absent."""
+    if "member name" not in lower_command:
+        return None
+    after = lower_command.split("member name", 1)[1].strip()
+    for loc_word in LOCATION_WORDS:
+        if loc_word in after:
+            after = after.split(loc_word, 1)[0].strip()
+    return after.strip(" '\"")
+
+
+def _alternation(phrases):
+    ordered = sorted({phrase.lower() for phrase in phrases}, key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(phrase) for phrase in ordered) + r")\b")
+
+
+class FastParser:
+    """Rule-based parser for the fixed command templates, tried before spaCy.
+
+    State/province names and breed names are compiled into longest-first
+    alternations, so "west virginia" wins over "virginia" and case does not
+    matter. ``parse`` returns None whenever a word is left that the templates
+    do not explain (usually a person or farm name), and the caller then falls
+    back to the statistical NER.
+    """
+
+    def __init__(self, breeds=()):
+        self.breeds = {key.split(" - ", 1)[-1].lower(): key for key in breeds}
+        self._regions = _alternation(REGIONS)
+        self._breeds = _alternation(self.breeds) if self.breeds else None
+
+    def parse(self, command):
+        text = " ".join(command.lower().split())
+        if not text:
+            return None
+        remaining = text
+
+        member_name = member_name_from_command(text)
+        if member_name is not None:
+            remaining = remaining.replace(member_name, " ", 1)
+
+        state = None
+        match = self._regions.search(remaining)
+        if match:
+            state = region_name(match.group(1))
+            remaining = remaining[:match.start()] + " " + remaining[match.end():]
+            if self._regions.search(remaining):
+                return None
+
+        breed_name = None
+        if self._breeds is not None:
+            match = self._breeds.search(remaining)
+            if match:
+                breed_name = self.breeds[match.group(1)]
+                remaining = remaining[:match.start()] + " " + remaining[match.end():]
+
+        city = city_from_command(text)
+        leftovers = [word for word in WORD.findall(remaining) if word not in TEMPLATE_WORDS]
+        if city:
+            if city not in leftovers:
+                return None
+            leftovers.remove(city)
+        if leftovers:
+            return None
+        return FastParse(state, city, member_name or "", breed_name)
+
+
+@lru_cache(maxsize=4)
+def _parser_for(breeds):
+    return FastParser(breeds)
+
+
+def fast_parse(command):
+    """Parse ``command`` without spaCy, or return None when the model is needed."""
+    ensure_registry_paths()
+    from amgr_http_client import breed_map
+
+    return _parser_for(tuple(text for text, _ in tuple(breed_map.items()))).parse(command)
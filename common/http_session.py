@@ -0,0 +1,74 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.metrics import observe
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,*/*;q=0.8",
+}
+
+
+class HostRateLimiter:
+    """Spaces requests to each host at least ``1 / rate`` seconds apart.
+
+    Pass a ``multiprocessing.Manager`` dict and lock to share one budget
+    across worker processes.
+    """
+
+    def __init__(self, rate, slots=None, lock=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.slots = {} if slots is None else slots
+        self.lock = lock or threading.Lock()
+
+    def wait(self, host):
+        if not self.interval:
+            return 0.0
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.slots.get(host, 0.0))
+            self.slots[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        observe("wait_seconds", delay, step="rate_limit")
+        return delay
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    def __init__(self, limiter, **kwargs):
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.limiter.wait(urlsplit(request.url).netloc)
+        return super().send(request, **kwargs)
+
+
+def make_session(pool_size=10, headers=None, limiter=None):
+    session = requests.Session()
+    if limiter is None:
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    else:
+        adapter = RateLimitedAdapter(limiter, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def throttle(session, limiter, pool_size=10):
+    """Route every request made through an existing ``session`` via ``limiter``."""
+    adapter = RateLimitedAdapter(limiter, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,52 @@
+import json
+import logging
+import os
+import sys
+import threading
+
+ROOT_LOGGER = "scraper"
+_configured = False
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure(level=None, fmt=None, stream=None):
+    """Attach one handler to the ``scraper`` logger.
+
+    ``SCRAPER_LOG_LEVEL`` (default INFO) sets the level and
+    ``SCRAPER_LOG_FORMAT=json`` switches to one JSON object per line. The
+    plain format prints messages only, as the scrapers always have.
+    """
+    global _configured
+    logger = logging.getLogger(ROOT_LOGGER)
+    with _lock:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        handler = logging.StreamHandler(stream or sys.stdout)
+        if (fmt or os.environ.get("SCRAPER_LOG_FORMAT", "plain")) == "json":
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel((level or os.environ.get("SCRAPER_LOG_LEVEL", "INFO")).upper())
+        logger.propagate = False
+        _configured = True
+    return logger
+
+
+def get_logger(name):
+    if not _configured:
+        configure()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
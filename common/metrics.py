@@ -0,0 +1,196 @@
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common.log import get_logger
+
+logger = get_logger("metrics")
+
+PREFIX = "scraper_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _labels_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """In-process counters and histograms keyed by name and labels.
+
+    ``span`` times a stage into the ``stage_seconds`` histogram. Everything
+    can be rendered as Prometheus text or as a JSON snapshot.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _labels_key(labels))
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.counts[index] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+
+    @contextmanager
+    def span(self, stage, **labels):
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe("stage_seconds", elapsed, stage=stage, status=status, **labels)
+            logger.debug(f"⏱️ {stage} {elapsed * 1000:.1f} ms ({status})")
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _labels_key(labels)), 0)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for (name, key), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name, "labels": dict(key), "count": h.count, "sum": round(h.sum, 6),
+                    "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], h.counts)),
+                }
+                for (name, key), h in sorted(self._histograms.items())
+            ]
+        return {"ts": round(time.time(), 3), "counters": counters, "histograms": histograms}
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            declared = set()
+            for (name, key), value in sorted(self._counters.items()):
+                metric = PREFIX + name
+                if metric not in declared:
+                    lines.append(f"# TYPE {metric} counter")
+                    declared.add(metric)
+                lines.append(f"{metric}{_format_labels(key)} {value}")
+            for (name, key), h in sorted(self._histograms.items()):
+                metric = PREFIX + name
+                if metric not in declared:
+                    lines.append(f"# TYPE {metric} histogram")
+                    declared.add(metric)
+                cumulative = 0
+                for bound, count in zip(list(self.buckets) + ["+Inf"], h.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{metric}_sum{_format_labels(key)} {h.sum:.6f}")
+                lines.append(f"{metric}_count{_format_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.snapshot()) + "\n")
+
+
+metrics = Metrics()
+span = metrics.span
+incr = metrics.incr
+observe = metrics.observe
+
+
+def serve_metrics(port, host="127.0.0.1", registry=None):
+    """Serve ``/metrics`` (Prometheus text) and ``/metrics.json`` from a daemon thread."""
+    registry = registry or metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = registry.render_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(registry.snapshot()), "application/json"
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_exporters_started = False
+
+
+def start_exporters():
+    """Start the exporters configured by environment, once per process.
+
+    ``SCRAPER_METRICS_PORT`` serves the HTTP endpoint; ``SCRAPER_METRICS_JSON``
+    appends a snapshot line every ``SCRAPER_METRICS_INTERVAL`` seconds and at exit.
+    """
+    global _exporters_started
+    if _exporters_started:
+        return
+    _exporters_started = True
+
+    port = os.environ.get("SCRAPER_METRICS_PORT")
+    if port:
+        server = serve_metrics(int(port))
+        logger.info(f"📈 Metrics on http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+
+    path = os.environ.get("SCRAPER_METRICS_JSON")
+    if path:
+        interval = float(os.environ.get("SCRAPER_METRICS_INTERVAL", "60"))
+
+        def flush_periodically():
+            while True:
+                time.sleep(interval)
+                metrics.write_json(path)
+
+        threading.Thread(target=flush_periodically, daemon=True).start()
+        atexit.register(metrics.write_json, path)
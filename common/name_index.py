@@ -0,0 +1,116 @@
+import heapq
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from common.records import name_key
+
+_NON_LETTERS = re.compile(r"[^a-z]")
+
+
+def trigrams(key):
+    """Character trigrams of a normalized key, padded so short names still produce some."""
+    if not key:
+        return frozenset()
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@lru_cache(maxsize=65536)
+def compact_name(name):
+    return _NON_LETTERS.sub("", name.lower())
+
+
+def member_filter(expected_member_name):
+    """Row predicate for an expected member name, normalized once rather than per row.
+
+    A row matches when the letters of its name contain the expected letters
+    or are contained in them.
+    """
+    if not expected_member_name:
+        return lambda name: True
+    expected = compact_name(expected_member_name)
+    if not expected:
+        return lambda name: True
+
+    def matches(name):
+        actual = compact_name(name)
+        return expected in actual or actual in expected
+
+    return matches
+
+
+class NameIndex:
+    """Trigram postings over member names, built once per directory.
+
+    Names are normalized with ``name_key`` (farm/breeder stop words dropped).
+    Lookups only visit names that share a trigram with the query, so cost
+    follows the number of plausible candidates, not the directory size.
+    """
+
+    def __init__(self, names=()):
+        self.names = []
+        self.keys = []
+        self._sizes = []
+        self._postings = defaultdict(list)
+        self._short = []
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        name_id = len(self.names)
+        key = name_key(name)
+        grams = trigrams(key)
+        self.names.append(name)
+        self.keys.append(key)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings[gram].append(name_id)
+        if len(key) < 3:
+            self._short.append(name_id)
+        return name_id
+
+    def _shared(self, grams):
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        return shared
+
+    def search(self, query, limit=5, cutoff=0.0):
+        """Best ``limit`` names as ``(name, score)``, scored by trigram Dice similarity."""
+        grams = trigrams(name_key(query))
+        if not grams:
+            return []
+        scored = []
+        for name_id, count in self._shared(grams).items():
+            score = 2.0 * count / (len(grams) + self._sizes[name_id])
+            if score >= cutoff:
+                scored.append((score, -name_id))
+        return [(self.names[-neg_id], round(score, 4)) for score, neg_id in heapq.nlargest(limit, scored)]
+
+    def best(self, query, cutoff=0.5):
+        matches = self.search(query, limit=1, cutoff=cutoff)
+        return matches[0][0] if matches else None
+
+    def containing(self, query):
+        """Names whose key contains the query's key or is contained in it, in index order."""
+        key = name_key(query)
+        if not key:
+            return []
+        if len(key) < 3:
+            candidates = range(len(self.names))
+        else:
+            candidates = sorted(set(self._shared(trigrams(key))) | set(self._short))
+        return [
+            self.names[name_id] for name_id in candidates
+            if self.keys[name_id] and (key in self.keys[name_id] or self.keys[name_id] in key)
+        ]
+
+
+@lru_cache(maxsize=16)
+def index_for(names):
+    """Shared index for a tuple of names, e.g. the options of a directory dropdown."""
+    return NameIndex(names)
@@ -0,0 +1,46 @@
+import os
+import threading
+
+import spacy
+
+DEFAULT_MODEL = os.environ.get("SCRAPER_SPACY_MODEL", "en_core_web_sm")
+REQUIRED_COMPONENTS = ("ner",)
+
+_pipelines = {}
+_lock = threading.Lock()
+
+
+def required_pipes(nlp, required=REQUIRED_COMPONENTS):
+    """Names of the required components plus any shared tok2vec they listen to."""
+    keep = [name for name in nlp.pipe_names if name in required]
+    for name, pipe in nlp.pipeline:
+        listeners = getattr(pipe, "listening_components", None) or []
+        if any(component in keep for component in listeners):
+            keep.append(name)
+    return keep
+
+
+def load_pipeline(model=DEFAULT_MODEL, exclude=()):
+    nlp = spacy.load(model, exclude=list(exclude))
+    nlp.select_pipes(enable=required_pipes(nlp))
+    return nlp
+
+
+def get_nlp(model=DEFAULT_MODEL, exclude=()):
+    """Process-wide spaCy pipeline, loaded on first use with only NER enabled.
+
+    Components listed in ``exclude`` are not loaded at all.
+    """
+    key = (model, tuple(sorted(exclude)))
+    nlp = _pipelines.get(key)
+    if nlp is None:
+        with _lock:
+            nlp = _pipelines.get(key)
+            if nlp is None:
+                nlp = _pipelines[key] = load_pipeline(model, exclude)
+    return nlp
+
+
+def clear_cache():
+    with _lock:
+        _pipelines.clear()
@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from collections.abc import Sequence
+
+from common.metrics import incr
+
+READ_OPTIONS_JS = """
+var out = {};
+for (var i = 0; i < arguments[0].length; i++) {
+    var name = arguments[0][i];
+    var select = document.querySelector('select[name="' + name + '"]') || document.getElementById(name);
+    if (!select) {
+        continue;
+    }
+    out[name] = Array.prototype.map.call(select.options, function (option) {
+        return [option.text, option.value];
+    });
+}
+return out;
+"""
+
+
+def _key(text):
+    return " ".join(text.split()).lower()
+
+
+class OptionList(Sequence):
+    """The ``(text, value)`` options of one <select>, with O(1) lookups both ways."""
+
+    __slots__ = ("options", "_by_text", "_by_value")
+
+    def __init__(self, options=()):
+        self.options = [(" ".join(text.split()), value) for text, value in options]
+        self._by_text = {}
+        self._by_value = {}
+        for text, value in self.options:
+            self._by_text.setdefault(_key(text), value)
+            self._by_value.setdefault(value, text)
+
+    def __len__(self):
+        return len(self.options)
+
+    def __getitem__(self, index):
+        return self.options[index]
+
+    @property
+    def texts(self):
+        return [text for text, _ in self.options]
+
+    @property
+    def first_value(self):
+        return self.options[0][1] if self.options else ""
+
+    def has_value(self, value):
+        return value in self._by_value
+
+    def text_for(self, value):
+        return self._by_value.get(value)
+
+    def value_for(self, text, partial=True):
+        """Value of the option labelled ``text``; falls back to the first label containing it."""
+        target = _key(text)
+        if target in self._by_text:
+            return self._by_text[target]
+        if partial:
+            for option_text, value in self.options:
+                if target in option_text.lower():
+                    return value
+        return None
+
+
+def read_select_options(driver, names):
+    """Options of every named <select> on the current page, read in one script call."""
+    raw = driver.execute_script(READ_OPTIONS_JS, list(names)) or {}
+    return {name: OptionList(options) for name, options in raw.items()}
+
+
+class OptionCache:
+    """Dropdown option lists keyed by form, kept for ``ttl`` seconds.
+
+    Registry dropdowns change rarely, so one capture serves every query until
+    it expires or is invalidated.
+    """
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                incr("option_cache_total", result="hit")
+                return entry[1]
+        incr("option_cache_total", result="miss")
+        value = loader()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+option_cache = OptionCache(ttl=int(os.environ.get("SCRAPER_OPTION_CACHE_TTL", "3600")))
@@ -0,0 +1,138 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from common.metrics import incr, span
+
+_MISSING = object()
+
+
+def normalize_command(command: str) -> str:
+    # Whitespace only: the possessive regex and spaCy NER both read capitalisation.
+    return " ".join(command.split())
+
+
+def _encode(value):
+    if isinstance(value, tuple):
+        return {"tuple": [_encode(item) for item in value]}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict) and set(value) == {"tuple"}:
+        return tuple(_decode(item) for item in value["tuple"])
+    return value
+
+
+class ParseCache:
+    """Bounded, thread-safe LRU cache for parser results with TTL expiry.
+
+    Keys are ``(namespace, normalized command)``. When ``snapshot_path`` is
+    set the cache is loaded from it on start and written back at exit.
+    """
+
+    def __init__(self, maxsize=4096, ttl=24 * 3600, snapshot_path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if snapshot_path:
+            self.load()
+            atexit.register(self.save)
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def get(self, namespace, command, default=_MISSING):
+        key = (namespace, normalize_command(command))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, namespace, command, value, stored_at=None):
+        key = (namespace, normalize_command(command))
+        with self._lock:
+            self._entries[key] = (value, stored_at if stored_at is not None else time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions}
+
+    def save(self, path=None):
+        path = path or self.snapshot_path
+        if not path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [
+                [namespace, command, _encode(value), stored_at]
+                for (namespace, command), (value, stored_at) in self._entries.items()
+                if not self._expired(stored_at, now)
+            ]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path=None):
+        path = path or self.snapshot_path
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for namespace, command, value, stored_at in entries:
+            if not self._expired(stored_at, now):
+                self.set(namespace, command, _decode(value), stored_at)
+
+
+parse_cache = ParseCache(
+    maxsize=int(os.environ.get("SCRAPER_PARSE_CACHE_SIZE", "4096")),
+    snapshot_path=os.environ.get("SCRAPER_PARSE_CACHE_PATH"),
+)
+
+
+def cached_parse(namespace, cache=None):
+    """Memoize a ``parser(command, doc=None)`` on its normalized command text."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(command, *args, **kwargs):
+            active = cache or parse_cache
+            value = active.get(namespace, command)
+            incr("parse_cache_total", namespace=namespace, result="miss" if value is _MISSING else "hit")
+            if value is _MISSING:
+                with span("nlp_parse", namespace=namespace):
+                    value = func(command, *args, **kwargs)
+                active.set(namespace, command, value)
+            return dict(value) if isinstance(value, dict) else value
+        return wrapper
+    return decorator
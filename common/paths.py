@@ -0,0 +1,12 @@
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REGISTRY_DIRS = (os.path.join(ROOT_DIR, "amgr"), os.path.join(ROOT_DIR, "shorthorn"))
+
+
+def ensure_registry_paths():
+    """Make the per-registry script directories importable from shared code."""
+    for path in REGISTRY_DIRS:
+        if path not in sys.path:
+            sys.path.append(path)
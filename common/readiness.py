@@ -0,0 +1,178 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from common.log import get_logger
+from common.metrics import observe
+
+logger = get_logger("readiness")
+
+ARM_DATATABLE_DRAW = """
+var id = arguments[0];
+window.__scraperDraws = window.__scraperDraws || {};
+if (window.jQuery && jQuery.fn.dataTable && jQuery.fn.dataTable.isDataTable('#' + id)) {
+    if (!(id in window.__scraperDraws)) {
+        window.__scraperDraws[id] = 0;
+        jQuery('#' + id).on('draw.dt', function () { window.__scraperDraws[id] += 1; });
+    }
+    return window.__scraperDraws[id];
+}
+return null;
+"""
+
+DRAW_COUNT = "return (window.__scraperDraws || {})[arguments[0]];"
+
+AJAX_IDLE = """
+return document.readyState === 'complete'
+    && (!window.jQuery || jQuery.active === 0);
+"""
+
+
+class AdaptiveTimeouts:
+    """Per-step timeouts derived from recently observed wait durations.
+
+    The timeout for a step is ``factor`` times the slowest of its last
+    ``window`` observations, capped at ``maximum``. The step's default is the
+    floor: a slow site can stretch a timeout, but fast samples never cut it
+    below what the step was written to allow.
+    """
+
+    def __init__(self, default=15.0, maximum=60.0, factor=3.0, window=50):
+        self.default = default
+        self.maximum = maximum
+        self.factor = factor
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def get(self, step, default=None):
+        with self._lock:
+            floor = default or self.default
+            samples = self._samples.get(step)
+            if not samples:
+                return floor
+            return max(floor, min(self.maximum, max(samples) * self.factor))
+
+    def observe(self, step, seconds):
+        with self._lock:
+            self._samples[step].append(seconds)
+
+
+timeouts = AdaptiveTimeouts()
+
+
+def timed_wait(driver, step, condition, timeout=None, default=None):
+    """``WebDriverWait(...).until(condition)`` with a learned timeout for ``step``.
+
+    ``default`` is the timeout used before any latency has been observed.
+    """
+    started = time.perf_counter()
+    limit = timeout or timeouts.get(step, default)
+    result = WebDriverWait(driver, limit, poll_frequency=0.1).until(condition)
+    elapsed = time.perf_counter() - started
+    timeouts.observe(step, elapsed)
+    observe("wait_seconds", elapsed, step=step)
+    return result
+
+
+def wait_for_document_ready(driver, step="document_ready", timeout=None):
+    return timed_wait(
+        driver, step, lambda d: d.execute_script("return document.readyState") == "complete", timeout
+    )
+
+
+def wait_for_ajax(driver, step="ajax_idle", timeout=None):
+    return timed_wait(driver, step, lambda d: d.execute_script(AJAX_IDLE), timeout)
+
+
+def wait_for_staleness(driver, element, step="staleness", timeout=None):
+    return timed_wait(driver, step, EC.staleness_of(element), timeout)
+
+
+def arm_datatable_draw(driver, table_id):
+    """Start counting DataTables ``draw.dt`` events; returns the current count or None."""
+    try:
+        return driver.execute_script(ARM_DATATABLE_DRAW, table_id)
+    except WebDriverException:
+        return None
+
+
+def wait_for_datatable_redraw(driver, table_id, armed_count, previous_first_row=None,
+                              step="datatable_redraw", timeout=None):
+    """Wait for the redraw that follows a paging action.
+
+    Uses the ``draw.dt`` counter when DataTables was armed, otherwise the
+    staleness of the previous first row.
+    """
+    if armed_count is not None:
+        return timed_wait(
+            driver, step, lambda d: (d.execute_script(DRAW_COUNT, table_id) or 0) > armed_count, timeout
+        )
+    if previous_first_row is not None:
+        return wait_for_staleness(driver, previous_first_row, step, timeout)
+    return wait_for_ajax(driver, step, timeout)
+
+
+def drain_network_log(driver):
+    """Discard buffered DevTools performance entries so a following wait only sees newer requests."""
+    try:
+        driver.get_log("performance")
+    except (WebDriverException, ValueError):
+        pass
+
+
+def _track_requests(entries, pending, url_filter=None):
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method = message.get("method")
+        params = message.get("params", {})
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            if url_filter is None or url_filter in params.get("request", {}).get("url", ""):
+                pending.add(request_id)
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            pending.discard(request_id)
+    return pending
+
+
+def wait_for_network_idle(driver, idle_time=0.5, step="network_idle", timeout=None, url_filter=None):
+    """Wait until no network request has been in flight for ``idle_time`` seconds.
+
+    Reads the DevTools performance log (enabled by common.driver_pool's
+    ``goog:loggingPrefs``); falls back to jQuery/readyState when it is absent.
+    With ``url_filter`` only requests whose URL contains it are tracked, so
+    beacons and long-polls elsewhere on the page are ignored; call
+    drain_network_log() before the action to skip earlier requests. Best effort: a page that never goes quiet (long-polling, analytics
+    beacons) is logged and returns False rather than raising.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except (WebDriverException, ValueError):
+        try:
+            return wait_for_ajax(driver, step, timeout)
+        except TimeoutException:
+            logger.warning(f"⚠️ Page still busy after waiting for {step}; continuing.")
+            return False
+
+    limit = timeout or timeouts.get(step)
+    started = time.perf_counter()
+    pending = _track_requests(entries, set(), url_filter)
+    idle_since = None
+    while time.perf_counter() - started < limit:
+        if _track_requests(driver.get_log("performance"), pending, url_filter):
+            idle_since = None
+        elif idle_since is None:
+            idle_since = time.perf_counter()
+        elif time.perf_counter() - idle_since >= idle_time:
+            elapsed = time.perf_counter() - started
+            timeouts.observe(step, elapsed)
+            observe("wait_seconds", elapsed, step=step)
+            return True
+        time.sleep(0.05)
+    logger.warning(f"⚠️ Network did not go idle within {limit:.1f}s; continuing.")
+    observe("wait_seconds", limit, step=step)
+    return False
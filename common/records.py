@@ -0,0 +1,131 @@
+import re
+import sys
+from collections.abc import Sequence
+
+from common.gazetteer import region_code
+
+NAME_STOP_WORDS = frozenset({"farm", "farms", "breeder", "breeders", "in", "from"})
+
+
+def name_key(name):
+    """Lower-case alphanumeric name tokens without the farm/breeder stop words, space-joined."""
+    return " ".join(token for token in re.findall(r"[a-z0-9]+", name.lower()) if token not in NAME_STOP_WORDS)
+
+
+class Record:
+    """Compact row shared by both registries.
+
+    Subclasses list their columns in ``FIELDS`` and as ``__slots__``. The
+    state code and normalized name key are derived once at construction, and
+    repeated values (state, city) are interned so a full-directory snapshot
+    holds one copy of each.
+    """
+
+    __slots__ = ("state_code", "name_key")
+    FIELDS = ()
+    NAME_FIELD = "name"
+    STATE_FIELD = "state"
+    INTERNED = ("state",)
+
+    def __init__(self, *values):
+        if len(values) != len(self.FIELDS):
+            raise TypeError(f"{type(self).__name__} takes {len(self.FIELDS)} values, got {len(values)}")
+        for field, value in zip(self.FIELDS, values):
+            if field in self.INTERNED:
+                value = sys.intern(value)
+            setattr(self, field, value)
+        state = getattr(self, self.STATE_FIELD)
+        self.state_code = sys.intern(region_code(state) or state.upper())
+        self.name_key = name_key(getattr(self, self.NAME_FIELD))
+
+    def __iter__(self):
+        return (getattr(self, field) for field in self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [getattr(self, field) for field in self.FIELDS[index]]
+        return getattr(self, self.FIELDS[index])
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return type(self) is type(other) and tuple(self) == tuple(other)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        values = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+    def _asdict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class AmgrRecord(Record):
+    FIELDS = ("state", "name", "farm", "phone", "website")
+    __slots__ = FIELDS
+
+
+class ShorthornRecord(Record):
+    FIELDS = ("member_type", "member_no", "prefix", "name", "dba", "city", "state")
+    INTERNED = ("member_type", "city", "state")
+    __slots__ = FIELDS
+
+
+class ColumnView(Sequence):
+    """Read-only view of one column of a ResultSet; no values are copied."""
+
+    __slots__ = ("_records", "_field")
+
+    def __init__(self, records, field):
+        self._records = records
+        self._field = field
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [getattr(record, self._field) for record in self._records[index]]
+        return getattr(self._records[index], self._field)
+
+
+class ResultSet(Sequence):
+    """Ordered collection of records of one type with column views."""
+
+    __slots__ = ("record_type", "records")
+
+    def __init__(self, record_type, records=()):
+        self.record_type = record_type
+        self.records = [record if isinstance(record, record_type) else record_type(*record) for record in records]
+
+    def append(self, record):
+        self.records.append(record if isinstance(record, self.record_type) else self.record_type(*record))
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def column(self, field):
+        if field not in self.record_type.FIELDS and field not in ("state_code", "name_key"):
+            raise KeyError(field)
+        return ColumnView(self.records, field)
+
+    def rows(self):
+        return [list(record) for record in self.records]
+
+
+AMGR_HEADERS = ["State", "Name", "Farm", "Phone", "Website"]
+SHORTHORN_HEADERS = ['Type', 'Member #', 'Prefix', 'Member Name', 'DBA', 'City', 'State/Prov']
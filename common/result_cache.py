@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from common.log import get_logger
+from common.metrics import incr
+
+logger = get_logger("result_cache")
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "nlp-scraping", "results.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    rows TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    checked_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_namespace ON results (namespace);
+CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at);
+"""
+
+
+def make_key(namespace, params):
+    return namespace + ":" + json.dumps(params, sort_keys=True)
+
+
+def rows_digest(rows):
+    return hashlib.sha1(json.dumps(rows).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed cache of scrape results keyed on the resolved query.
+
+    Entries younger than ``ttl`` are served as-is. Entries older than ``ttl``
+    but younger than ``ttl + stale_ttl`` are served immediately while a
+    background refresh revalidates them; a refresh that returns the same rows
+    only bumps ``checked_at``. The least recently read entries are evicted once
+    the table holds more than ``max_entries`` rows.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=6 * 3600, stale_ttl=24 * 3600, max_entries=10000):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._shared = sqlite3.connect(path, check_same_thread=False) if path == ":memory:" else None
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        if self._shared is not None:
+            return _LockedConnection(self._shared, self._db_lock)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return _ClosingConnection(conn)
+
+    def lookup(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT rows, checked_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0]), time.time() - row[1]
+
+    def store(self, key, namespace, rows):
+        now = time.time()
+        digest = rows_digest(rows)
+        with self._connect() as conn:
+            current = conn.execute("SELECT digest FROM results WHERE key = ?", (key,)).fetchone()
+            if current is not None and current[0] == digest:
+                conn.execute("UPDATE results SET checked_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, namespace, rows, digest, stored_at, checked_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, namespace, json.dumps(rows), digest, now, now, now),
+            )
+            self._evict(conn)
+        return True
+
+    def _evict(self, conn):
+        if not self.max_entries:
+            return
+        conn.execute(
+            "DELETE FROM results WHERE key IN ("
+            "SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def invalidate(self, key=None, namespace=None):
+        with self._connect() as conn:
+            if key is not None:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            elif namespace is not None:
+                conn.execute("DELETE FROM results WHERE namespace = ?", (namespace,))
+            else:
+                conn.execute("DELETE FROM results")
+
+    def size(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def fetch(self, namespace, params, loader):
+        key = make_key(namespace, params)
+        cached = self.lookup(key)
+        if cached is not None:
+            rows, age = cached
+            if age <= self.ttl:
+                incr("result_cache_total", namespace=namespace, result="hit")
+                return rows
+            if age <= self.ttl + self.stale_ttl:
+                incr("result_cache_total", namespace=namespace, result="stale")
+                self._refresh_in_background(key, namespace, loader)
+                return rows
+
+        incr("result_cache_total", namespace=namespace, result="miss")
+        rows = loader()
+        self.store(key, namespace, rows)
+        return rows
+
+    def _refresh_in_background(self, key, namespace, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.store(key, namespace, loader())
+            except Exception as e:
+                logger.warning(f"⚠️ Background refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+
+class _ClosingConnection:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+        finally:
+            self.conn.close()
+
+
+class _LockedConnection:
+    def __init__(self, conn, lock):
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        return self.conn
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.lock.release()
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_result_cache():
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResultCache(
+                path=os.environ.get("SCRAPER_RESULT_CACHE_PATH", DEFAULT_PATH),
+                ttl=float(os.environ.get("SCRAPER_RESULT_CACHE_TTL", 6 * 3600)),
+            )
+        return _shared_cache
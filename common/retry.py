@@ -0,0 +1,172 @@
+import os
+import random
+import socket
+import threading
+import time
+
+import requests
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from common.log import get_logger
+from common.metrics import incr
+
+logger = get_logger("retry")
+
+RETRYABLE = frozenset({"timeout", "stale", "upstream", "parse"})
+# Only these say the site itself is unwell; any other outcome means it answered.
+SITE_HEALTH = frozenset({"timeout", "upstream"})
+
+
+class ParseError(ValueError):
+    """A response arrived but did not contain the expected results markup."""
+
+
+class CircuitOpen(RuntimeError):
+    def __init__(self, site, retry_in):
+        super().__init__(f"Circuit for '{site}' is open; retrying in {retry_in:.0f}s")
+        self.site = site
+        self.retry_in = retry_in
+
+
+def classify(error):
+    """``timeout``, ``stale``, ``upstream``, ``parse``, ``circuit`` or ``fatal`` for an exception."""
+    if isinstance(error, CircuitOpen):
+        return "circuit"
+    if isinstance(error, StaleElementReferenceException):
+        return "stale"
+    if isinstance(error, (TimeoutException, requests.Timeout, socket.timeout, TimeoutError)):
+        return "timeout"
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return "upstream" if status is None or status >= 500 or status == 429 else "fatal"
+    if isinstance(error, (requests.ConnectionError, ConnectionError)):
+        return "upstream"
+    if isinstance(error, ParseError):
+        return "parse"
+    return "fatal"
+
+
+class RetryPolicy:
+    """Up to ``attempts`` tries with full-jitter exponential backoff capped at ``cap`` seconds."""
+
+    def __init__(self, attempts=3, base=0.5, cap=10.0, sleep=time.sleep):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.sleep = sleep
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Fails fast once a site has failed ``threshold`` times in a row.
+
+    After ``reset_after`` seconds one trial call is let through; success
+    closes the circuit again and failure re-opens it.
+    """
+
+    def __init__(self, site, threshold=5, reset_after=30.0, clock=time.monotonic):
+        self.site = site
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if self.clock() - self.opened_at >= self.reset_after else "open"
+
+    def check(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = self.clock() - self.opened_at
+            if waited < self.reset_after or self._trial:
+                raise CircuitOpen(self.site, max(self.reset_after - waited, 0.0))
+            self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if not (self._trial or self.failures >= self.threshold):
+                return
+            if self.opened_at is None or self._trial:
+                logger.warning(f"🚧 Opening circuit for {self.site} after {self.failures} failures.")
+                incr("circuit_open_total", site=self.site)
+            self.opened_at = self.clock()
+            self._trial = False
+
+
+default_policy = RetryPolicy(attempts=int(os.environ.get("SCRAPER_RETRY_ATTEMPTS", "3")))
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(site):
+    with _breakers_lock:
+        breaker = _breakers.get(site)
+        if breaker is None:
+            breaker = _breakers[site] = CircuitBreaker(
+                site,
+                threshold=int(os.environ.get("SCRAPER_BREAKER_THRESHOLD", "5")),
+                reset_after=float(os.environ.get("SCRAPER_BREAKER_RESET", "30")),
+            )
+        return breaker
+
+
+def should_retry(site, error, attempt, policy=None, trip=True):
+    """Count a failed attempt and, if it is worth another try, sleep out its backoff and return True.
+
+    ``trip=False`` leaves the breaker alone, for callers retrying errors that
+    ``retry_call`` has already counted.
+    """
+    policy = policy or default_policy
+    kind = classify(error)
+    if trip and kind in SITE_HEALTH:
+        breaker_for(site).record_failure()
+    elif trip and kind != "circuit":
+        breaker_for(site).record_success()
+    if kind not in RETRYABLE or attempt + 1 >= policy.attempts:
+        incr("errors_total", site=site, error=kind)
+        return False
+    delay = policy.backoff(attempt)
+    logger.warning(f"🔁 {site} {kind} error ({error}); retry {attempt + 1} in {delay:.2f}s.")
+    incr("retries_total", site=site, error=kind)
+    policy.sleep(delay)
+    return True
+
+
+def exhausted(error):
+    """True once ``retry_call`` has spent its attempts on ``error``, so outer layers don't retry it again."""
+    return getattr(error, "_retries_exhausted", False)
+
+
+def retry_call(fn, site, policy=None):
+    """``fn()`` behind ``site``'s circuit breaker, retried on transient errors."""
+    breaker = breaker_for(site)
+    attempt = 0
+    while True:
+        breaker.check()
+        try:
+            result = fn()
+        except Exception as e:
+            if not should_retry(site, e, attempt, policy):
+                e._retries_exhausted = True
+                raise
+            attempt += 1
+            continue
+        breaker.record_success()
+        return result
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import os
+import sys
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.executor import Job, QueryExecutor, jobs_for
+from common.log import get_logger
+from common.metrics import incr, metrics, span
+from common.records import AMGR_HEADERS, SHORTHORN_HEADERS
+
+logger = get_logger("service")
+
+HEADERS = {"amgr": AMGR_HEADERS, "shorthorn": SHORTHORN_HEADERS}
+MAX_BODY_BYTES = 64 * 1024
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def parse_query(command):
+    from common.batch_parse import parse_doc
+
+    return parse_doc(command, None)
+
+
+def job_key(job):
+    return job.registry, json.dumps(job.params, sort_keys=True, default=str)
+
+
+class QueryService:
+    """Long-running JSON API over the shared executor, caches and driver pool.
+
+    Identical jobs that are already in flight are coalesced: later requests
+    await the first request's scrape instead of starting their own.
+    """
+
+    def __init__(self, executor=None, parse=parse_query):
+        self.executor = executor or QueryExecutor()
+        self.parse = parse
+        self._inflight = {}
+
+    async def run_job(self, job):
+        key = job_key(job)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.executor.run_job(job))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            incr("service_jobs_total", registry=job.registry, coalesced="no")
+        else:
+            incr("service_jobs_total", registry=job.registry, coalesced="yes")
+        return await asyncio.shield(task)
+
+    async def query(self, payload):
+        registries = payload.get("registries") or list(self.executor.backends)
+        unknown = [name for name in registries if name not in self.executor.backends]
+        if unknown:
+            raise BadRequest(f"Unknown registries: {', '.join(unknown)}")
+
+        parsed = None
+        if payload.get("command"):
+            parsed = await self.executor.run_blocking(self.parse, payload["command"])
+            jobs = jobs_for(parsed, registries)
+        elif payload.get("registry"):
+            if payload["registry"] not in self.executor.backends:
+                raise BadRequest(f"Unknown registry: {payload['registry']}")
+            jobs = [Job(payload["registry"], dict(payload.get("params") or {}))]
+        else:
+            raise BadRequest("Expected 'command' or 'registry' with 'params'")
+
+        results = await asyncio.gather(*(self.run_job(job) for job in jobs))
+        return {
+            "query": parsed._asdict() if parsed is not None else None,
+            "results": [
+                {
+                    "registry": result.job.registry,
+                    "params": result.job.params,
+                    "headers": HEADERS.get(result.job.registry),
+                    "rows": [list(row) for row in result.rows] if result.rows is not None else None,
+                    "error": str(result.error) if result.error is not None else None,
+                    "elapsed": round(result.elapsed, 4),
+                }
+                for result in results
+            ],
+        }
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == "/health":
+            return HTTPStatus.OK, {"status": "ok", "inflight": len(self._inflight)}
+        if url.path == "/metrics":
+            return HTTPStatus.OK, metrics.render_prometheus()
+        if url.path != "/query":
+            return HTTPStatus.NOT_FOUND, {"error": "not found"}
+
+        if method == "GET":
+            query = parse_qs(url.query)
+            payload = {"command": query.get("q", [""])[0], "registries": query.get("registry")}
+        elif method == "POST":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return HTTPStatus.BAD_REQUEST, {"error": "Body must be JSON"}
+            if not isinstance(payload, dict):
+                return HTTPStatus.BAD_REQUEST, {"error": "Body must be a JSON object"}
+        else:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed"}
+
+        try:
+            with span("service_request"):
+                return HTTPStatus.OK, await self.query(payload)
+        except BadRequest as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"}
+                    body = b""
+                else:
+                    body = await reader.readexactly(length)
+                    try:
+                        status, payload = await self.dispatch(method.upper(), target, body)
+                    except Exception as e:
+                        logger.exception(f"❌ Request failed: {method} {target}")
+                        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive and length <= MAX_BODY_BYTES)
+                await writer.drain()
+                if not keep_alive or length > MAX_BODY_BYTES:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            data, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+
+    async def start(self, host="127.0.0.1", port=8080):
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        self.executor.close()
+
+
+def warm_up():
+    """Load the spaCy pipeline before the first request instead of during it."""
+    from common.nlp_loader import get_nlp
+
+    try:
+        get_nlp()
+    except OSError as e:
+        logger.warning(f"⚠️ spaCy model unavailable ({e}); only fast-path commands will parse.")
+
+
+async def serve(host="127.0.0.1", port=8080):
+    service = QueryService()
+    await asyncio.get_running_loop().run_in_executor(None, warm_up)
+    server = await service.start(host, port)
+    logger.info(f"🛰️ Query service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from common.metrics import start_exporters
+
+    parser = argparse.ArgumentParser(description="Serve registry queries over HTTP/JSON.")
+    parser.add_argument("--host", default=os.environ.get("SCRAPER_SERVICE_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("SCRAPER_SERVICE_PORT", "8080")))
+    args = parser.parse_args()
+
+    start_exporters()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,122 @@
+import csv
+import json
+import sys
+
+from tabulate import tabulate
+
+from common.metrics import span
+
+
+class Sink:
+    """Receives batches of rows as they are scraped and renders them."""
+
+    def __init__(self, headers):
+        self.headers = list(headers)
+        self.rows_written = 0
+
+    def write(self, rows):
+        rows = [list(row) for row in rows]
+        if rows:
+            with span("format", sink=type(self).__name__):
+                self._write(rows)
+            self.rows_written += len(rows)
+
+    def _write(self, rows):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TabulateSink(Sink):
+    """Buffers rows and prints one table on close, or one table per batch when ``per_batch``."""
+
+    def __init__(self, headers, tablefmt="fancy_grid", stream=None, per_batch=False):
+        super().__init__(headers)
+        self.tablefmt = tablefmt
+        self.stream = stream or sys.stdout
+        self.per_batch = per_batch
+        self._buffer = []
+
+    def _write(self, rows):
+        if self.per_batch:
+            print(tabulate(rows, headers=self.headers, tablefmt=self.tablefmt), file=self.stream, flush=True)
+        else:
+            self._buffer.extend(rows)
+
+    def close(self):
+        if self._buffer:
+            print(tabulate(self._buffer, headers=self.headers, tablefmt=self.tablefmt), file=self.stream)
+            self._buffer = []
+
+
+class NdjsonSink(Sink):
+    def __init__(self, headers, stream=None):
+        super().__init__(headers)
+        self.stream = stream or sys.stdout
+
+    def _write(self, rows):
+        for row in rows:
+            self.stream.write(json.dumps(dict(zip(self.headers, row))) + "\n")
+        self.stream.flush()
+
+
+class CsvSink(Sink):
+    def __init__(self, headers, stream=None):
+        super().__init__(headers)
+        self.stream = stream or sys.stdout
+        self._writer = csv.writer(self.stream)
+        self._writer.writerow(self.headers)
+
+    def _write(self, rows):
+        self._writer.writerows(rows)
+        self.stream.flush()
+
+
+class ParquetSink(Sink):
+    """Writes each batch as a Parquet row group. Requires the optional ``pyarrow`` package."""
+
+    def __init__(self, headers, path):
+        super().__init__(headers)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("ParquetSink requires pyarrow: pip install pyarrow") from e
+        self._pa = pa
+        self._schema = pa.schema([(header, pa.string()) for header in self.headers])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def _write(self, rows):
+        columns = list(zip(*rows))
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(column, type=self._pa.string()) for column in columns], schema=self._schema
+        ))
+
+    def close(self):
+        self._writer.close()
+
+
+SINKS = {"table": TabulateSink, "ndjson": NdjsonSink, "csv": CsvSink, "parquet": ParquetSink}
+
+
+def make_sink(fmt, headers, **kwargs):
+    try:
+        sink_class = SINKS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown output format '{fmt}'; choose one of {', '.join(SINKS)}")
+    return sink_class(headers, **kwargs)
+
+
+def drain(pages, sink):
+    """Feed every page from ``pages`` into ``sink`` as it arrives, then close it."""
+    with sink:
+        for page in pages:
+            sink.write(page)
+    return sink.rows_written
@@ -0,0 +1,310 @@
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from common.gazetteer import region_code
+from common.log import get_logger
+from common.paths import ensure_registry_paths
+from common.records import AMGR_HEADERS, SHORTHORN_HEADERS, AmgrRecord, ResultSet, ShorthornRecord, name_key
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "nlp-scraping", "snapshot.sqlite3")
+REGISTRIES = ("amgr", "shorthorn")
+
+logger = get_logger("snapshot")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS amgr_members (
+    state TEXT, name TEXT, farm TEXT, phone TEXT, website TEXT, breeds TEXT
+);
+CREATE TABLE IF NOT EXISTS shorthorn_members (
+    type TEXT, member_no TEXT, prefix TEXT, name TEXT, dba TEXT, city TEXT, state TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshot_meta (
+    registry TEXT PRIMARY KEY, crawled_at REAL, row_count INTEGER
+);
+"""
+
+
+class SnapshotStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def replace_amgr(self, rows):
+        """``rows`` are ``[state, name, farm, phone, website, breeds]`` with ``breeds`` a list."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM amgr_members")
+            self.conn.executemany(
+                "INSERT INTO amgr_members VALUES (?, ?, ?, ?, ?, ?)",
+                [row[:5] + [json.dumps(sorted(row[5]))] for row in rows],
+            )
+            self._mark("amgr", len(rows))
+
+    def replace_shorthorn(self, rows):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM shorthorn_members")
+            self.conn.executemany("INSERT INTO shorthorn_members VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._mark("shorthorn", len(rows))
+
+    def _mark(self, registry, row_count):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO snapshot_meta VALUES (?, ?, ?)", (registry, time.time(), row_count)
+        )
+
+    def amgr_rows(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT state, name, farm, phone, website, breeds FROM amgr_members").fetchall()
+        return [list(row[:5]) + [json.loads(row[5])] for row in rows]
+
+    def shorthorn_rows(self):
+        with self._lock:
+            return [list(row) for row in self.conn.execute("SELECT * FROM shorthorn_members").fetchall()]
+
+    def crawled_at(self, registry):
+        with self._lock:
+            row = self.conn.execute("SELECT crawled_at FROM snapshot_meta WHERE registry = ?", (registry,)).fetchone()
+        return row[0] if row else None
+
+    def versions(self):
+        return {registry: self.crawled_at(registry) for registry in REGISTRIES}
+
+
+class SnapshotMissing(LookupError):
+    """A snapshot query for a registry that has never been crawled into the store."""
+
+
+class _Index:
+    def __init__(self):
+        self.postings = defaultdict(set)
+        self._tokens = None
+
+    def add(self, key, row_id):
+        if key:
+            self.postings[key].add(row_id)
+            self._tokens = None
+
+    def get(self, key):
+        return self.postings.get(key, set())
+
+    def prefix(self, prefix):
+        if self._tokens is None:
+            self._tokens = sorted(self.postings)
+        start = bisect.bisect_left(self._tokens, prefix)
+        matched = set()
+        for token in self._tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            matched |= self.postings[token]
+        return matched
+
+
+class _Table:
+    def __init__(self, records, breeds=None):
+        self.records = records
+        self.state = _Index()
+        self.city = _Index()
+        self.breed = _Index()
+        self.name = _Index()
+        for row_id, record in enumerate(records):
+            self.state.add(record.state_code, row_id)
+            city = getattr(record, "city", None)
+            if city:
+                self.city.add(city.lower(), row_id)
+            if breeds is not None:
+                for breed in breeds[row_id]:
+                    self.breed.add(breed, row_id)
+            for token in record.name_key.split():
+                self.name.add(token, row_id)
+
+    def select(self, state=None, city=None, breed=None, member_name=None):
+        candidates = None
+
+        def narrow(ids):
+            nonlocal candidates
+            candidates = set(ids) if candidates is None else candidates & ids
+
+        if state:
+            narrow(self.state.get(region_code(state) or state.upper()))
+        if city:
+            narrow(self.city.get(city.lower()))
+        if breed:
+            narrow(self.breed.get(breed))
+        if member_name:
+            for token in name_key(member_name).split():
+                narrow(self.name.prefix(token))
+
+        if candidates is None:
+            return list(self.records)
+        return [self.records[row_id] for row_id in sorted(candidates)]
+
+
+class SnapshotQueryEngine:
+    """Answers registry queries from in-memory indexes over a snapshot.
+
+    ``versions`` maps each registry to its ``crawled_at`` in the store; a
+    registry mapped to None was never crawled and raises SnapshotMissing.
+    """
+
+    def __init__(self, amgr_rows, shorthorn_rows, versions=None):
+        self.versions = versions
+        self.amgr_records = ResultSet(AmgrRecord, (row[:5] for row in amgr_rows))
+        self.shorthorn_records = ResultSet(ShorthornRecord, shorthorn_rows)
+        self._amgr = _Table(self.amgr_records, breeds=[row[5] for row in amgr_rows])
+        self._shorthorn = _Table(self.shorthorn_records)
+
+    @classmethod
+    def from_store(cls, store):
+        return cls(store.amgr_rows(), store.shorthorn_rows(), store.versions())
+
+    def _require(self, registry):
+        if self.versions is not None and self.versions.get(registry) is None:
+            raise SnapshotMissing(f"No {registry} snapshot yet; run python common/crawl.py to build one")
+
+    def amgr(self, state=None, breed_name=None, member_name=None):
+        self._require("amgr")
+        return self._amgr.select(state=state, breed=breed_name, member_name=member_name)
+
+    def shorthorn(self, state=None, city=None, member_name=None):
+        self._require("shorthorn")
+        if state and state.lower() == "united states":
+            state = None
+        return self._shorthorn.select(state=state, city=city, member_name=member_name)
+
+    def answer(self, query):
+        return {
+            "amgr": self.amgr(query.state, query.breed_name, query.member),
+            "shorthorn": self.shorthorn(query.location, query.city, query.member_name),
+        }
+
+
+def crawl_amgr(client=None):
+    ensure_registry_paths()
+    from amgr_http_client import AmgrHttpClient, breed_map
+
+    client = client or AmgrHttpClient()
+    action, _, selects = client.form()
+    base = client.build_form_data()
+    breed_names = {value: name for name, value in tuple(breed_map.items())}
+
+    members = {}
+    for _, breed_id in selects.get("breedID", []):
+        data = dict(base, breedID=breed_id)
+        breed = breed_names.get(breed_id)
+        logger.info(f"🐐 Crawling AMGR breed: {breed or '[ALL BREEDS]'}")
+        for row in client.fetch_rows(action, data):
+            entry = members.setdefault(tuple(row), set())
+            if breed:
+                entry.add(breed)
+    return [list(row) + [breeds] for row, breeds in members.items()]
+
+
+def crawl_shorthorn(client=None):
+    ensure_registry_paths()
+    from shorthorn_http_client import ShorthornHttpClient, build_search_params
+
+    client = client or ShorthornHttpClient()
+    _, selected_value = client.resolve_location("United States")
+    logger.info("🐂 Crawling Shorthorn: all states")
+    pages = client.iter_pages(build_search_params(selected_value, "", "", "897"))
+    return [row for page in pages for row in page]
+
+
+def take_snapshot(store, amgr_client=None, shorthorn_client=None):
+    store.replace_amgr(crawl_amgr(amgr_client))
+    store.replace_shorthorn(crawl_shorthorn(shorthorn_client))
+    return SnapshotQueryEngine.from_store(store)
+
+
+class SnapshotRefresher:
+    """Re-crawls the directories into ``store`` every ``interval`` seconds on a daemon thread.
+
+    get_query_engine() notices the new ``crawled_at`` and reloads.
+    """
+
+    def __init__(self, store, interval=24 * 3600, crawl=take_snapshot):
+        self.store = store
+        self.interval = interval
+        self.crawl = crawl
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        self.crawl(self.store)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"⚠️ Snapshot refresh failed: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+_shared_store = None
+_shared_engine = None
+_shared_refresher = None
+_shared_lock = threading.Lock()
+
+
+def get_query_engine(path=None):
+    """The process-wide engine, rebuilt whenever a crawl has rewritten the store since it was loaded.
+
+    With ``SCRAPER_SNAPSHOT_REFRESH`` set (seconds), a SnapshotRefresher also
+    re-crawls the store in the background.
+    """
+    global _shared_store, _shared_engine, _shared_refresher
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = SnapshotStore(path or os.environ.get("SCRAPER_SNAPSHOT_PATH", DEFAULT_PATH))
+            interval = float(os.environ.get("SCRAPER_SNAPSHOT_REFRESH", "0"))
+            if interval > 0:
+                _shared_refresher = SnapshotRefresher(_shared_store, interval).start()
+        versions = _shared_store.versions()
+        if _shared_engine is None or _shared_engine.versions != versions:
+            if _shared_engine is not None:
+                logger.info("🔄 Snapshot changed on disk; reloading the query engine.")
+            _shared_engine = SnapshotQueryEngine.from_store(_shared_store)
+        return _shared_engine
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from common.batch_parse import parse_commands
+    from tabulate import tabulate
+
+    parser = argparse.ArgumentParser(description="Mirror both directories locally and query the snapshot.")
+    parser.add_argument("--db", default=os.environ.get("SCRAPER_SNAPSHOT_PATH", DEFAULT_PATH))
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    subparsers.add_parser("crawl")
+    query_parser = subparsers.add_parser("query")
+    query_parser.add_argument("command")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.db)
+    if args.action == "crawl":
+        started = time.time()
+        take_snapshot(store)
+        print(f"✅ Snapshot written to {args.db} in {time.time() - started:.1f}s")
+    else:
+        query, = parse_commands([args.command])
+        results = SnapshotQueryEngine.from_store(store).answer(query)
+        print(tabulate(results["amgr"], headers=AMGR_HEADERS, tablefmt="fancy_grid"))
+        print(tabulate(results["shorthorn"], headers=SHORTHORN_HEADERS, tablefmt="github"))
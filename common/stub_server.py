@@ -0,0 +1,97 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class StubServer:
+    """Local HTTP server that replays recorded pages for offline tests.
+
+    ``routes`` maps a request path to either a file path, a string body, or a
+    callable ``(method, query, form) -> (status, body)``.
+    """
+
+    def __init__(self, routes, host="127.0.0.1", port=0):
+        self.routes = dict(routes)
+        self.requests = []
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _resolve(self, method, path, query, form):
+        route = self.routes.get(path)
+        if route is None:
+            return 404, "not found"
+        if callable(route):
+            return route(method, query, form)
+        if isinstance(route, str) and os.path.isfile(route):
+            with open(route, encoding="utf-8") as f:
+                return 200, f.read()
+        return 200, route
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self, method):
+                parts = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+                form = {}
+                if method == "POST":
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = self.rfile.read(length).decode("utf-8")
+                    form = {k: v[0] for k, v in parse_qs(body, keep_blank_values=True).items()}
+                stub.requests.append((method, parts.path, query, form))
+
+                status, body = stub._resolve(method, parts.path, query, form)
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def paged_member_results(total, page_size):
+    """Route serving ``total`` distinct Shorthorn members, ``page_size`` per ``o`` offset."""
+    def route(method, query, form):
+        offset = int(query.get("o", "0"))
+        rows = "".join(
+            f'<tr id="tr_{number}"><td>Active</td><td>{number}</td><td></td><td>Member {number}</td>'
+            f'<td></td><td>JEMISON</td><td>AL</td></tr>'
+            for number in range(offset, min(offset + page_size, total))
+        )
+        return 200, f"<table><tr><td><table>{rows}</table></td></tr></table>"
+    return route
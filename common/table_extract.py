@@ -0,0 +1,95 @@
+from lxml import html
+from selenium.common.exceptions import WebDriverException
+
+EXTRACT_ROWS_JS = """
+var rows = document.querySelectorAll(arguments[0]);
+var out = [];
+for (var i = 0; i < rows.length; i++) {
+    var cells = rows[i].children;
+    var values = [];
+    for (var j = 0; j < cells.length; j++) {
+        if (cells[j].tagName === 'TD') {
+            values.push(cells[j].innerText !== undefined ? cells[j].innerText : cells[j].textContent);
+        }
+    }
+    out.push(values);
+}
+return out;
+"""
+
+
+def normalize_text(text):
+    return " ".join((text or "").replace("\xa0", " ").split())
+
+
+def rows_from_html(page_html, row_xpath, min_cells=1):
+    """Cell texts of every row matched by ``row_xpath`` with at least ``min_cells`` cells."""
+    if not page_html.strip():
+        return []
+    tree = html.fromstring(page_html)
+    table_data = []
+    for row in tree.xpath(row_xpath):
+        cells = row.xpath("./td")
+        if len(cells) >= min_cells:
+            table_data.append([normalize_text(cell.text_content()) for cell in cells])
+    return table_data
+
+
+def extract_rows(driver, row_css, row_xpath, min_cells=1):
+    """Read a whole table in one ``execute_script`` call.
+
+    Falls back to parsing a single ``page_source`` snapshot when the script
+    cannot run, so either way the cost is one WebDriver round trip.
+    """
+    try:
+        raw_rows = driver.execute_script(EXTRACT_ROWS_JS, row_css)
+    except WebDriverException:
+        return rows_from_html(driver.page_source, row_xpath, min_cells)
+    return [[normalize_text(value) for value in cells] for cells in raw_rows if len(cells) >= min_cells]
+
+
+DATATABLE_ROWS_JS = """
+var id = arguments[0];
+if (!(window.jQuery && jQuery.fn.dataTable && jQuery.fn.dataTable.isDataTable('#' + id))) {
+    return null;
+}
+var api = jQuery('#' + id).DataTable();
+var scratch = document.createElement('div');
+var rows = api.rows({search: 'applied'}).data().toArray().map(function (row) {
+    var cells = Array.isArray(row) ? row : Object.keys(row).map(function (key) { return row[key]; });
+    return cells.map(function (cell) {
+        scratch.innerHTML = cell === null || cell === undefined ? '' : String(cell);
+        return scratch.textContent;
+    });
+});
+return {total: api.page.info().recordsDisplay, rows: rows};
+"""
+
+EXPAND_DATATABLE_JS = "jQuery('#' + arguments[0]).DataTable().page.len(-1).draw(false);"
+GOTO_DATATABLE_PAGE_JS = "jQuery('#' + arguments[0]).DataTable().page(arguments[1]).draw('page');"
+
+
+def datatable_data(driver, table_id):
+    """All rows held by a DataTables instance, read from its data API in one call.
+
+    Returns ``(rows, total)`` where ``total`` is DataTables' own count of
+    displayable records, or None when ``table_id`` is not a DataTable.
+    """
+    try:
+        result = driver.execute_script(DATATABLE_ROWS_JS, table_id)
+    except WebDriverException:
+        return None
+    if not result:
+        return None
+    rows = [[normalize_text(value) for value in cells] for cells in result["rows"]]
+    return rows, result["total"]
+
+
+def expand_datatable(driver, table_id):
+    """Switch a DataTable to its "all" page length so every row is in the DOM."""
+    driver.execute_script(EXPAND_DATATABLE_JS, table_id)
+
+
+def goto_datatable_page(driver, table_id, index):
+    """Show page ``index`` (0-based) of a DataTable. Absolute, so repeating it after a failure is safe."""
+    driver.execute_script(GOTO_DATATABLE_PAGE_JS, table_id, index)
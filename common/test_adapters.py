@@ -0,0 +1,138 @@
+import os
+import unittest
+from contextlib import contextmanager
+
+from common.adapters import ADAPTERS, RegistryAdapter, get_adapter, load_adapters, register_adapter
+from common.batch_parse import ParsedQuery
+from common.executor import jobs_for
+from common.metrics import metrics
+from common.option_cache import OptionCache
+from common.paths import ROOT_DIR, ensure_registry_paths
+from common.records import AmgrRecord, ShorthornRecord
+from common.stub_server import StubServer, paged_member_results
+
+ensure_registry_paths()
+from amgr_http_client import AmgrHttpClient  # noqa: E402
+from shorthorn_http_client import SEARCH_RESULTS_PATH, ShorthornHttpClient  # noqa: E402
+
+ROW = ["TX", "Lone Star Breeders", "Lone Star Ranch", "", ""]
+
+
+class FakePool:
+    def __init__(self):
+        self.leases = 0
+
+    @contextmanager
+    def lease(self):
+        self.leases += 1
+        yield "driver"
+
+
+class FakeAdapter(RegistryAdapter):
+    name = "fake"
+    record = AmgrRecord
+
+    def __init__(self, http_error=None, **kwargs):
+        super().__init__(client="client", **kwargs)
+        self.http_error = http_error
+
+    def fetch_http(self, client, state=None):
+        if self.http_error:
+            raise self.http_error
+        yield [ROW]
+        yield [ROW[:1] + ["Second Page"] + ROW[2:]]
+
+    def fetch_selenium(self, driver, state=None):
+        yield [ROW]
+
+
+class TestRegistryAdapter(unittest.TestCase):
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_pages_extract_records_in_order(self):
+        pages = list(FakeAdapter().pages({"state": "Texas"}))
+
+        self.assertEqual([len(page) for page in pages], [1, 1])
+        self.assertIsInstance(pages[0][0], AmgrRecord)
+        self.assertEqual(pages[1][0].name, "Second Page")
+
+    def test_http_failure_falls_back_to_leased_browser(self):
+        pool = FakePool()
+        adapter = FakeAdapter(http_error=RuntimeError("blocked"), pool=pool)
+
+        self.assertEqual(adapter.search({"state": "Texas"}), [ROW])
+        self.assertEqual(pool.leases, 1)
+        self.assertEqual(metrics.counter("fallbacks_total", registry="fake"), 1)
+
+    def test_last_engine_failure_is_raised(self):
+        adapter = FakeAdapter(http_error=RuntimeError("blocked"), query_engine=object())
+        with self.assertRaises(ValueError):
+            adapter.search({}, engine="warp")
+        with self.assertRaises(NotImplementedError):
+            adapter.search({}, engine="snapshot")
+
+    def test_registry(self):
+        register_adapter(FakeAdapter)
+        self.addCleanup(ADAPTERS.pop, "fake")
+
+        self.assertIn("amgr", load_adapters())
+        self.assertIn("shorthorn", ADAPTERS)
+        self.assertIsInstance(get_adapter("fake"), FakeAdapter)
+        with self.assertRaises(KeyError):
+            get_adapter("missing")
+
+    def test_jobs_for_plans_each_registry(self):
+        query = ParsedQuery("Show all breeders in Texas", "Texas", None, None, "texas", "", "", "574")
+        jobs = jobs_for(query)
+        self.assertEqual([job.registry for job in jobs], ["amgr", "shorthorn"])
+        self.assertEqual(jobs[1].params["t_param"], "574")
+
+        no_location = query._replace(location=None)
+        self.assertEqual([job.registry for job in jobs_for(no_location)], ["amgr"])
+
+
+class TestRegistryAdaptersOverHttp(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(os.path.join(ROOT_DIR, "amgr", "fixtures", "directory_form.html"), encoding="utf-8") as f:
+            form_page = f.read()
+        with open(os.path.join(ROOT_DIR, "amgr", "fixtures", "directory_results.html"), encoding="utf-8") as f:
+            results_page = f.read()
+
+        def directory(method, query, form):
+            return 200, results_page if method == "POST" else form_page
+
+        cls.server = StubServer({
+            "/frm_directorySearch.cfm": directory,
+            "/": os.path.join(ROOT_DIR, "shorthorn", "fixtures", "landing.html"),
+            SEARCH_RESULTS_PATH: paged_member_results(total=7, page_size=3),
+        }).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_amgr_adapter(self):
+        client = AmgrHttpClient(url=self.server.base_url + "/frm_directorySearch.cfm", options=OptionCache(ttl=0))
+        pages = list(get_adapter("amgr", client=client).pages({"state": "Texas", "breed_name": None, "member_name": None}))
+
+        self.assertEqual(len(pages), 1)
+        self.assertTrue(pages[0])
+        self.assertIsInstance(pages[0][0], AmgrRecord)
+
+    def test_shorthorn_adapter_streams_every_page(self):
+        client = ShorthornHttpClient(base_url=self.server.base_url, options=OptionCache(ttl=0))
+        adapter = get_adapter("shorthorn", client=client)
+        params = {"state": "alabama", "city": "", "member_name": "", "t_param": "574"}
+        pages = list(adapter.pages(params))
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertIsInstance(pages[0][0], ShorthornRecord)
+        self.assertIn("t=574", adapter.search_url(params))
+
+
+if __name__ == "__main__":
+    unittest.main()
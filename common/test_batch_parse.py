@@ -0,0 +1,76 @@
+import unittest
+
+import spacy
+from spacy.language import Language
+
+from common.batch_parse import parse_commands
+from common.parse_cache import parse_cache
+
+processed = []
+
+
+@Language.component("record_texts")
+def record_texts(doc):
+    processed.append(doc.text)
+    return doc
+
+
+def make_nlp():
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "GPE", "pattern": "Texas"},
+        {"label": "GPE", "pattern": "virginia"},
+    ])
+    nlp.add_pipe("record_texts")
+    return nlp
+
+
+class TestBatchParse(unittest.TestCase):
+
+    def setUp(self):
+        processed.clear()
+        parse_cache.clear()
+
+    def test_parse_commands(self):
+        commands = [
+            "Show all Boer breeders in Texas",
+            "search member name abby mill",
+            "search from virginia and jemison city",
+            "find Hurlbert in Texas",
+        ]
+        results = list(parse_commands(commands, nlp=make_nlp(), batch_size=2))
+
+        self.assertEqual(processed, ["find Hurlbert in Texas"])
+        self.assertEqual([q.command for q in results], commands)
+        self.assertEqual((results[0].state, results[0].breed_name, results[0].t_param), ("Texas", "(B) - Boer", "574"))
+        self.assertEqual((results[1].member_name, results[1].t_param), ("abby mill", "901"))
+        self.assertEqual((results[2].location, results[2].city, results[2].t_param), ("virginia", "jemison", "803"))
+        self.assertEqual((results[3].state, results[3].location), ("Texas", "texas"))
+
+    def test_one_pipe_across_batches(self):
+        nlp = make_nlp()
+        calls = []
+        pipe = nlp.pipe
+
+        def counting_pipe(texts, **kwargs):
+            if kwargs.get("as_tuples"):  # spaCy re-enters pipe() for the texts themselves
+                calls.append(kwargs)
+            return pipe(texts, **kwargs)
+
+        nlp.pipe = counting_pipe
+        commands = ["find Hurlbert in Texas", "Show all Boer breeders in Texas", "find Smith in virginia"] * 3
+        results = list(parse_commands(commands, nlp=nlp, batch_size=2))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([q.command for q in results], commands)
+        self.assertEqual(processed, [c for c in commands if c.startswith("find")])
+
+    def test_unrecognized_command(self):
+        query, = parse_commands(["hello there"], nlp=make_nlp())
+        self.assertIsNone(query.location)
+        self.assertIsNone(query.t_param)
+
+
+if __name__ == "__main__":
+    unittest.main()
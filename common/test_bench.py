@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from common.bench import (
+    compare, load_baseline, peak_rss_kb, percentile, reset_peak_rss, run_benchmarks, save_baseline, scale_rows
+)
+
+
+class TestBench(unittest.TestCase):
+
+    def test_percentile_is_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual((percentile(samples, 50), percentile(samples, 95), percentile(samples, 99)), (50, 95, 99))
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_scale_rows(self):
+        page = "<table><tbody><tr><td>a</td></tr><tr><td>b</td></tr></tbody></table>"
+        self.assertEqual(scale_rows(page, "//tr", 3).count("<tr>"), 6)
+
+    def test_scenarios_run_offline_and_round_trip_baselines(self):
+        results = run_benchmarks(["extract.amgr", "e2e.shorthorn"], iterations=3, scale=2, warmup=1)
+        self.assertEqual(set(results), {"extract.amgr", "e2e.shorthorn"})
+        self.assertLessEqual(results["extract.amgr"]["p50_ms"], results["extract.amgr"]["p99_ms"])
+
+        path = os.path.join(tempfile.mkdtemp(), "baseline.json")
+        save_baseline(path, results, iterations=3, scale=2)
+        self.assertEqual(load_baseline(path), results)
+
+    def test_peak_rss_is_per_scenario(self):
+        if not reset_peak_rss():
+            self.skipTest("RSS high-water mark can't be reset here")
+        ballast = b"x" * (128 * 1024 * 1024)
+        high = peak_rss_kb()
+        del ballast
+        results = run_benchmarks(["extract.amgr"], iterations=1, scale=1, warmup=0)
+        self.assertLess(results["extract.amgr"]["peak_rss_kb"], high - 64 * 1024)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"extract.amgr": {"p95_ms": 2.0}}
+        self.assertEqual(compare({"extract.amgr": {"p95_ms": 2.4}}, baseline), [])
+        self.assertEqual(len(compare({"extract.amgr": {"p95_ms": 2.6}}, baseline)), 1)
+        self.assertEqual(compare({"new.scenario": {"p95_ms": 9.0}}, baseline), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
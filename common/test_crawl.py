@@ -0,0 +1,207 @@
+import io
+import json
+import os
+import threading
+import time
+import unittest
+
+from common.adapters import RegistryAdapter
+from common.crawl import (
+    CrawlCheckpoint, Shard, ShardEntry, ShardHistory, crawl, diff_rows, due_shards, refresh, shard_digest, shard_key
+)
+from common.http_session import HostRateLimiter
+from common.paths import ROOT_DIR, ensure_registry_paths
+from common.snapshot import SnapshotQueryEngine, SnapshotStore
+from common.stub_server import StubServer, paged_member_results
+
+ensure_registry_paths()
+from shorthorn_http_client import SEARCH_RESULTS_PATH  # noqa: E402
+
+
+def fixture(registry, name):
+    with open(os.path.join(ROOT_DIR, registry, "fixtures", name), encoding="utf-8") as f:
+        return f.read()
+
+
+class TestHostRateLimiter(unittest.TestCase):
+
+    def test_spaces_requests_per_host(self):
+        limiter = HostRateLimiter(rate=20)
+        started = time.time()
+        delays = [limiter.wait("a.example") for _ in range(3)]
+        other = limiter.wait("b.example")
+
+        self.assertEqual(delays[0], 0.0)
+        self.assertGreaterEqual(time.time() - started, 0.09)
+        self.assertEqual(other, 0.0)
+
+    def test_unlimited(self):
+        self.assertEqual(HostRateLimiter(rate=0).wait("a.example"), 0.0)
+
+
+class KeyedAdapter(RegistryAdapter):
+    def record_key(self, row):
+        return row[0]
+
+
+class TestIncrementalHelpers(unittest.TestCase):
+
+    def test_digest_ignores_row_order(self):
+        self.assertEqual(shard_digest([["1", "a"], ["2", None]]), shard_digest([["2", None], ["1", "a"]]))
+        self.assertNotEqual(shard_digest([["1", "a"]]), shard_digest([["1", "b"]]))
+
+    def test_diff_rows(self):
+        changes = diff_rows(KeyedAdapter(), [["1", "a"], ["2", "b"]], [["2", "c"], ["3", "d"]])
+        self.assertEqual(sorted((op, key) for op, key, _, _ in changes),
+                         [("added", "3"), ("changed", "2"), ("removed", "1")])
+
+    def test_due_shards_prefers_volatile_then_stale(self):
+        shards = [Shard("r", key, {}) for key in ("quiet", "busy", "new", "fresh")]
+        history = {
+            "quiet": ShardEntry("", [], checked_at=0, churn=0.0),
+            "busy": ShardEntry("", [], checked_at=850, churn=0.9),
+            "fresh": ShardEntry("", [], checked_at=990, churn=0.0),
+        }
+        due = due_shards(shards, history, now=1000, min_interval=10, max_interval=1000)
+        self.assertEqual([shard.key for shard in due], ["new", "busy", "quiet"])
+        self.assertEqual([shard.key for shard in due_shards(shards, history, 1000, 10, 1000, limit=1)], ["new"])
+
+
+class TestCrawl(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        form_page = fixture("amgr", "directory_form.html")
+        results_page = fixture("amgr", "directory_results.html")
+        cls.total = 5
+        cls.broken = threading.Event()
+
+        def directory(method, query, form):
+            if method == "GET":
+                return 200, form_page
+            return 200, results_page if form["stateID"] == "43" else "<table id='example'><tbody></tbody></table>"
+
+        def search(method, query, form):
+            if cls.broken.is_set() and query["l"] == "United States|VA":
+                return 500, "upstream down"
+            return paged_member_results(total=cls.total, page_size=2)(method, query, form)
+
+        cls.server = StubServer({
+            "/frm_directorySearch.cfm": directory,
+            "/": fixture("shorthorn", "landing.html"),
+            SEARCH_RESULTS_PATH: search,
+        }).start()
+        cls.client_options = {
+            "amgr": {"url": cls.server.base_url + "/frm_directorySearch.cfm"},
+            "shorthorn": {"base_url": cls.server.base_url},
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        type(self).total = 5
+        self.broken.clear()
+        self.server.requests.clear()
+
+    def searched_locations(self):
+        return [query["l"] for _, path, query, _ in self.server.requests if path == SEARCH_RESULTS_PATH]
+
+    def test_amgr_shards_cover_states_by_breeds(self):
+        store = SnapshotStore(":memory:")
+        report = crawl(["amgr"], workers=1, rate=0, store=store, client_options=self.client_options)
+
+        self.assertEqual(report["amgr"]["shards"], 5 * 15)
+        self.assertEqual(report["amgr"]["failed"], [])
+        rows = store.amgr_rows()
+        self.assertEqual(len(rows), report["amgr"]["rows"])
+        self.assertTrue(all(len(row[5]) == 14 for row in rows))
+        self.assertTrue(SnapshotQueryEngine.from_store(store).amgr("Texas", "(AB) - American Boer"))
+
+    def test_interrupted_crawl_resumes_from_checkpoint(self):
+        checkpoint = CrawlCheckpoint(":memory:")
+        store = SnapshotStore(":memory:")
+        self.broken.set()
+
+        report = crawl(["shorthorn"], workers=2, rate=0, checkpoint=checkpoint, store=store,
+                       client_options=self.client_options)
+
+        self.assertEqual(report["shorthorn"]["shards"], 5)
+        self.assertEqual(report["shorthorn"]["failed"], [shard_key({"l": "United States|VA"})])
+        self.assertIsNone(report["shorthorn"]["rows"])
+        self.assertEqual(len(checkpoint.completed("shorthorn")), 4)
+        self.assertEqual(store.shorthorn_rows(), [])
+
+        self.broken.clear()
+        self.server.requests.clear()
+        report = crawl(["shorthorn"], workers=2, rate=0, checkpoint=checkpoint, store=store,
+                       client_options=self.client_options)
+
+        self.assertEqual(set(self.searched_locations()), {"United States|VA"})
+        self.assertEqual(report["shorthorn"]["failed"], [])
+        self.assertEqual(report["shorthorn"]["rows"], 5)
+        self.assertEqual(len(store.shorthorn_rows()), 5)
+        self.assertEqual(checkpoint.completed("shorthorn"), {})
+
+    def test_incremental_refresh_emits_only_changes(self):
+        history = ShardHistory(":memory:")
+        store = SnapshotStore(":memory:")
+        feed = io.StringIO()
+
+        def run(now):
+            return refresh(history, ["shorthorn"], workers=1, rate=0, store=store, feed=feed,
+                           client_options=self.client_options, min_interval=0, max_interval=0, now=now)["shorthorn"]
+
+        first = run(now=1)
+        self.assertEqual((first["checked"], first["changed"], first["changes"]), (5, 5, 5))
+        self.assertEqual(len(store.shorthorn_rows()), 5)
+
+        quiet = run(now=2)
+        self.assertEqual((quiet["checked"], quiet["changed"], quiet["changes"]), (5, 0, 0))
+
+        type(self).total = 6
+        feed.seek(0)
+        feed.truncate()
+        busy = run(now=3)
+        self.assertEqual((busy["changed"], busy["changes"]), (5, 1))
+        event, = [json.loads(line) for line in feed.getvalue().splitlines()]
+        self.assertEqual((event["registry"], event["op"], event["key"]), ("shorthorn", "added", "5"))
+        self.assertEqual(len(store.shorthorn_rows()), 6)
+
+        churn = {entry.churn for entry in history.entries("shorthorn").values()}
+        self.assertEqual(churn, {0.7 * 0.7 + 0.3})
+
+    def refresh_shorthorn(self, history, store, feed, now, limit=None):
+        return refresh(history, ["shorthorn"], workers=1, rate=0, store=store, feed=feed, limit=limit, now=now,
+                       client_options=self.client_options, min_interval=0, max_interval=0)["shorthorn"]
+
+    def test_limited_refresh_keeps_the_full_snapshot(self):
+        store = SnapshotStore(":memory:")
+        crawl(["shorthorn"], workers=1, rate=0, store=store, client_options=self.client_options)
+        history = ShardHistory(":memory:")
+        feed = io.StringIO()
+
+        partial = self.refresh_shorthorn(history, store, feed, now=1, limit=1)
+        self.assertEqual((partial["checked"], partial["pending"], partial["changes"]), (1, 4, 0))
+        self.assertEqual(len(store.shorthorn_rows()), 5)
+
+        rest = self.refresh_shorthorn(history, store, feed, now=2)
+        self.assertEqual((rest["checked"], rest["pending"], rest["changes"]), (5, 0, 0))
+        self.assertEqual(len(store.shorthorn_rows()), 5)
+        self.assertEqual(feed.getvalue(), "")
+
+    def test_crawl_seeds_history_for_refresh(self):
+        store = SnapshotStore(":memory:")
+        history = ShardHistory(":memory:")
+        crawl(["shorthorn"], workers=1, rate=0, store=store, client_options=self.client_options, history=history)
+        self.assertEqual(len(history.entries("shorthorn")), 5)
+
+        feed = io.StringIO()
+        report = self.refresh_shorthorn(history, store, feed, now=time.time() + 1)
+        self.assertEqual((report["checked"], report["changed"], report["changes"]), (5, 0, 0))
+        self.assertEqual(feed.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
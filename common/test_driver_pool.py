@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+
+from selenium.common.exceptions import WebDriverException
+
+from common.driver_pool import DriverPool
+
+
+class FakeSwitchTo:
+    def default_content(self):
+        pass
+
+
+class FakeDriver:
+    def __init__(self):
+        self.switch_to = FakeSwitchTo()
+        self.visited = []
+        self.cookies_cleared = 0
+        self.alive = True
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise WebDriverException("session deleted")
+        return 1
+
+    def delete_all_cookies(self):
+        self.cookies_cleared += 1
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def quit(self):
+        self.quit_called = True
+
+
+class TestDriverPool(unittest.TestCase):
+
+    def setUp(self):
+        self.launched = []
+
+        self.pool = DriverPool(size=2, max_uses=3, max_memory_growth_mb=None, factory=self.factory)
+
+    def factory(self):
+        driver = FakeDriver()
+        self.launched.append(driver)
+        return driver
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_reuses_warm_session(self):
+        with self.pool.lease() as first:
+            pass
+        with self.pool.lease() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(len(self.launched), 1)
+        self.assertEqual(first.cookies_cleared, 2)
+        self.assertEqual(first.visited, ["about:blank", "about:blank"])
+
+    def test_recycles_after_max_uses(self):
+        for _ in range(3):
+            with self.pool.lease():
+                pass
+        self.assertTrue(self.launched[0].quit_called)
+        with self.pool.lease() as driver:
+            self.assertIsNot(driver, self.launched[0])
+
+    def test_discards_unhealthy_session(self):
+        with self.pool.lease() as driver:
+            pass
+        driver.alive = False
+        with self.pool.lease() as replacement:
+            self.assertIsNot(replacement, driver)
+        self.assertTrue(driver.quit_called)
+
+    def test_discarded_session_wakes_a_waiter(self):
+        pool = DriverPool(size=1, max_uses=1, max_memory_growth_mb=None, factory=self.factory)
+        entered, leased = threading.Event(), []
+
+        def first():
+            with pool.lease(timeout=2):
+                entered.set()
+                time.sleep(0.1)
+
+        def second():
+            entered.wait()
+            with pool.lease(timeout=2) as driver:
+                leased.append(driver)
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(leased), 1)
+        self.assertEqual(len(self.launched), 2)
+        self.assertTrue(self.launched[0].quit_called)
+
+    def test_concurrent_leases_bounded(self):
+        with self.pool.lease() as a, self.pool.lease() as b:
+            self.assertIsNot(a, b)
+            with self.assertRaises(TimeoutError):
+                with self.pool.lease(timeout=0.05):
+                    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from common.executor import Job, QueryExecutor
+
+
+class TestQueryExecutor(unittest.TestCase):
+
+    def test_streams_in_completion_order(self):
+        async def fast(state):
+            return [[state]]
+
+        def slow(state):
+            time.sleep(0.1)
+            return [[state]]
+
+        executor = QueryExecutor(backends={"amgr": slow, "shorthorn": fast})
+        results = executor.run([Job("amgr", {"state": "Texas"}), Job("shorthorn", {"state": "virginia"})])
+        executor.close()
+
+        self.assertEqual([r.job.registry for r in results], ["shorthorn", "amgr"])
+        self.assertEqual(results[1].rows, [["Texas"]])
+
+    def test_per_site_concurrency_limit(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def backend(i):
+            with lock:
+                active.append(i)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(i)
+            return []
+
+        executor = QueryExecutor(backends={"amgr": backend}, limits={"amgr": 2})
+        results = executor.run([Job("amgr", {"i": i}) for i in range(6)])
+        executor.close()
+
+        self.assertEqual(len(results), 6)
+        self.assertLessEqual(max(peak), 2)
+
+    def test_errors_are_reported_per_job(self):
+        def broken():
+            raise RuntimeError("upstream down")
+
+        executor = QueryExecutor(backends={"amgr": broken})
+        result, missing = sorted(
+            executor.run([Job("amgr", {}), Job("unknown", {})]), key=lambda r: r.job.registry
+        )
+        executor.close()
+
+        self.assertIsInstance(result.error, RuntimeError)
+        self.assertIsInstance(missing.error, KeyError)
+
+    def test_stream_is_async_iterable(self):
+        async def backend():
+            return [["row"]]
+
+        executor = QueryExecutor(backends={"amgr": backend})
+
+        async def collect():
+            return [r.rows async for r in executor.stream([Job("amgr", {})])]
+
+        self.assertEqual(asyncio.run(collect()), [[["row"]]])
+        executor.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from common.fast_parse import FastParser, city_from_command, fast_parse, member_name_from_command
+
+BREEDS = ["(AB) - American Boer", "(B) - Boer", "(K) - Kiko"]
+
+
+class TestFastParse(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = FastParser(BREEDS)
+
+    def test_state_and_breed_templates(self):
+        self.assertEqual(self.parser.parse("Show all Boer breeders in Texas"), ("Texas", "", "", "(B) - Boer"))
+        self.assertEqual(self.parser.parse("show american boer breeders in virginia").breed_name, "(AB) - American Boer")
+
+    def test_lower_case_and_multi_word_states(self):
+        self.assertEqual(self.parser.parse("find breeders in west virginia").state, "West Virginia")
+        self.assertEqual(self.parser.parse("list ranches from new brunswick").state, "New Brunswick")
+
+    def test_member_name_and_city(self):
+        parsed = self.parser.parse("search member name abby mill from alabama")
+        self.assertEqual((parsed.state, parsed.member_name), ("Alabama", "abby mill"))
+        parsed = self.parser.parse("search from virginia and jemison city")
+        self.assertEqual((parsed.state, parsed.city), ("Virginia", "jemison"))
+
+    def test_unexplained_words_need_the_model(self):
+        self.assertIsNone(self.parser.parse("find Hurlbert in Texas"))
+        self.assertIsNone(self.parser.parse("Show John's farm"))
+        self.assertIsNone(self.parser.parse("breeders in texas or oklahoma"))
+        self.assertIsNone(self.parser.parse(""))
+
+    def test_shared_rules(self):
+        self.assertEqual(city_from_command("breeders in jemison city"), "jemison")
+        self.assertEqual(member_name_from_command("member name abby mill in texas"), "abby mill")
+        self.assertIsNone(member_name_from_command("show all breeders"))
+
+    def test_fast_parse_uses_the_live_breed_map(self):
+        self.assertEqual(fast_parse("Show all Kiko breeders in Colorado").breed_name, "(K) - Kiko")
+
+
+if __name__ == "__main__":
+    unittest.main()
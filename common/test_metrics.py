@@ -0,0 +1,67 @@
+import io
+import json
+import logging
+import unittest
+import urllib.request
+
+from common.log import configure, get_logger
+from common.metrics import Metrics, serve_metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics(buckets=(0.1, 1.0))
+
+    def test_counters_and_histograms(self):
+        self.metrics.incr("rows_total", 3, registry="amgr")
+        self.metrics.incr("rows_total", 2, registry="amgr")
+        self.metrics.observe("stage_seconds", 0.05, stage="submit")
+        self.metrics.observe("stage_seconds", 5.0, stage="submit")
+        self.assertEqual(self.metrics.counter("rows_total", registry="amgr"), 5)
+
+        text = self.metrics.render_prometheus()
+        self.assertIn('scraper_rows_total{registry="amgr"} 5', text)
+        self.assertIn('scraper_stage_seconds_bucket{stage="submit",le="0.1"} 1', text)
+        self.assertIn('scraper_stage_seconds_bucket{stage="submit",le="+Inf"} 2', text)
+        self.assertIn('scraper_stage_seconds_count{stage="submit"} 2', text)
+
+    def test_span_records_status(self):
+        with self.metrics.span("navigate", registry="amgr"):
+            pass
+        with self.assertRaises(ValueError):
+            with self.metrics.span("navigate", registry="amgr"):
+                raise ValueError
+        statuses = {h["labels"]["status"]: h["count"] for h in self.metrics.snapshot()["histograms"]}
+        self.assertEqual(statuses, {"ok": 1, "error": 1})
+
+    def test_http_endpoint(self):
+        self.metrics.incr("pages_total", registry="shorthorn")
+        server = serve_metrics(0, registry=self.metrics)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(base + "/metrics") as response:
+            self.assertIn("scraper_pages_total", response.read().decode())
+        with urllib.request.urlopen(base + "/metrics.json") as response:
+            self.assertEqual(json.load(response)["counters"][0]["value"], 1)
+
+
+class TestLog(unittest.TestCase):
+
+    def tearDown(self):
+        configure()
+
+    def test_json_format_and_levels(self):
+        stream = io.StringIO()
+        configure(level="WARNING", fmt="json", stream=stream)
+        logger = get_logger("test")
+        logger.info("hidden")
+        logger.warning("⚠️ shown")
+        entry = json.loads(stream.getvalue())
+        self.assertEqual((entry["level"], entry["logger"], entry["message"]), ("warning", "scraper.test", "⚠️ shown"))
+        self.assertFalse(logging.getLogger("scraper").propagate)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from common.name_index import NameIndex, member_filter, trigrams
+
+OPTIONS = ["-- All Members --", "Hurlbert, John", "Lone Star Breeders", "Abby Mill Farm", "Abby Jones", "Al"]
+
+
+class TestNameIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = NameIndex(OPTIONS)
+
+    def test_containing_ignores_stop_words(self):
+        self.assertEqual(self.index.containing("Abby Mill"), ["Abby Mill Farm"])
+        self.assertEqual(self.index.containing("lone star farms"), ["Lone Star Breeders"])
+        self.assertEqual(self.index.containing("abby"), ["Abby Mill Farm", "Abby Jones"])
+
+    def test_containing_finds_names_shorter_than_a_trigram(self):
+        self.assertEqual(self.index.containing("Al Smith"), ["Al"])
+
+    def test_search_ranks_by_similarity(self):
+        results = self.index.search("Hurlbrt John", limit=2)
+        self.assertEqual(results[0][0], "Hurlbert, John")
+        self.assertGreater(results[0][1], 0.5)
+        self.assertEqual(self.index.best("Abby Milll"), "Abby Mill Farm")
+        self.assertIsNone(self.index.best("Zebulon"))
+
+    def test_lookup_only_visits_names_sharing_a_trigram(self):
+        shared = self.index._shared(trigrams("lone"))
+        self.assertEqual(set(shared), {OPTIONS.index("Lone Star Breeders"), OPTIONS.index("Abby Jones")})
+
+    def test_member_filter(self):
+        matches = member_filter("Abby Mill")
+        self.assertTrue(matches("ABBY MILL FARM"))
+        self.assertFalse(matches("Abby Jones"))
+        self.assertTrue(member_filter(None)("anything"))
+
+
+if __name__ == "__main__":
+    unittest.main()
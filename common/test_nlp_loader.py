@@ -0,0 +1,26 @@
+import unittest
+
+import spacy
+
+from common import nlp_loader
+
+
+class TestNlpLoader(unittest.TestCase):
+
+    def tearDown(self):
+        nlp_loader.clear_cache()
+
+    def test_required_pipes_keeps_only_ner(self):
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        nlp.add_pipe("ner")
+        self.assertEqual(nlp_loader.required_pipes(nlp), ["ner"])
+
+    def test_get_nlp_is_cached(self):
+        first = nlp_loader.get_nlp("blank:en")
+        self.assertIs(nlp_loader.get_nlp("blank:en"), first)
+        self.assertIsNot(nlp_loader.get_nlp("blank:en", exclude=("parser",)), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest import mock
+
+from common.option_cache import OptionCache, OptionList, read_select_options
+
+
+class FakeDriver:
+    def __init__(self, options):
+        self.options = options
+        self.calls = 0
+
+    def execute_script(self, script, names):
+        self.calls += 1
+        return {name: self.options[name] for name in names if name in self.options}
+
+
+class TestOptionList(unittest.TestCase):
+
+    def test_lookups(self):
+        options = OptionList([("-- All States --", "0"), ("Virginia", "46"), ("West  Virginia", "47")])
+        self.assertEqual(options.value_for("virginia"), "46")
+        self.assertEqual(options.value_for("west virginia"), "47")
+        self.assertEqual(options.value_for("all states"), "0")
+        self.assertIsNone(options.value_for("all states", partial=False))
+        self.assertEqual(options.text_for("47"), "West Virginia")
+        self.assertTrue(options.has_value("0"))
+        self.assertEqual(options.first_value, "0")
+        self.assertEqual(list(options)[1], ("Virginia", "46"))
+
+
+class TestOptionCache(unittest.TestCase):
+
+    def test_reads_every_select_in_one_call(self):
+        driver = FakeDriver({"stateID": [["Texas", "43"]], "breedID": [["(B) - Boer", "3"]]})
+        options = read_select_options(driver, ["stateID", "breedID", "missing"])
+        self.assertEqual(driver.calls, 1)
+        self.assertEqual(options["breedID"].value_for("(B) - Boer"), "3")
+        self.assertNotIn("missing", options)
+
+    def test_entries_expire_after_ttl(self):
+        cache = OptionCache(ttl=60)
+        loader = mock.Mock(side_effect=["first", "second", "third"])
+        with mock.patch("common.option_cache.time.time", return_value=1000):
+            self.assertEqual(cache.get("form", loader), "first")
+            self.assertEqual(cache.get("form", loader), "first")
+        with mock.patch("common.option_cache.time.time", return_value=1061):
+            self.assertEqual(cache.get("form", loader), "second")
+        cache.invalidate("form")
+        self.assertEqual(cache.get("form", loader), "third")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from common.parse_cache import ParseCache, cached_parse, normalize_command
+
+
+class TestParseCache(unittest.TestCase):
+
+    def test_normalize_command(self):
+        self.assertEqual(normalize_command("  Show all  breeders\tin TEXAS "), "Show all breeders in TEXAS")
+
+    def test_memoizes_on_normalized_text(self):
+        cache = ParseCache()
+        calls = []
+
+        @cached_parse("test.parse", cache=cache)
+        def parse(command, doc=None):
+            calls.append(command)
+            return {"state": "Texas"}
+
+        first = parse("Show all breeders in Texas")
+        first["state"] = "changed"
+        self.assertEqual(parse(" Show all   breeders in Texas"), {"state": "Texas"})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats(), {"size": 1, "hits": 1, "misses": 1, "evictions": 0})
+
+    def test_keys_keep_case(self):
+        cache = ParseCache()
+
+        @cached_parse("test.parse", cache=cache)
+        def parse(command, doc=None):
+            return {"member": command.split()[1] if command.split()[1][0].isupper() else None}
+
+        self.assertEqual(parse("show John's farm"), {"member": "John's"})
+        self.assertEqual(parse("show john's farm"), {"member": None})
+
+    def test_lru_eviction(self):
+        cache = ParseCache(maxsize=2)
+        cache.set("ns", "a", 1)
+        cache.set("ns", "b", 2)
+        cache.get("ns", "a")
+        cache.set("ns", "c", 3)
+        self.assertIsNone(cache.get("ns", "b", None))
+        self.assertEqual(cache.get("ns", "a"), 1)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_ttl_expiry(self):
+        cache = ParseCache(ttl=10)
+        with mock.patch("common.parse_cache.time.time", return_value=1000):
+            cache.set("ns", "a", 1)
+        with mock.patch("common.parse_cache.time.time", return_value=1011):
+            self.assertIsNone(cache.get("ns", "a", None))
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "parse_cache.json")
+            cache = ParseCache()
+            cache.set("shorthorn.extract_place_parts", "search from virginia", ("virginia", ""))
+            cache.set("amgr.parse_command", "show all", {"state": None})
+            cache.save(path)
+
+            warm = ParseCache()
+            warm.load(path)
+            self.assertEqual(warm.get("shorthorn.extract_place_parts", "search from virginia"), ("virginia", ""))
+            self.assertEqual(warm.get("amgr.parse_command", "show  all"), {"state": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
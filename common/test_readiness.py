@@ -0,0 +1,77 @@
+import json
+import time
+import unittest
+
+from common.readiness import (
+    AdaptiveTimeouts, DRAW_COUNT, drain_network_log, wait_for_datatable_redraw, wait_for_network_idle
+)
+
+
+class FakeDriver:
+    def __init__(self, draw_counts=(), performance_logs=()):
+        self.draw_counts = list(draw_counts)
+        self.performance_logs = list(performance_logs)
+
+    def execute_script(self, script, *args):
+        if script == DRAW_COUNT:
+            return self.draw_counts.pop(0) if len(self.draw_counts) > 1 else self.draw_counts[0]
+        return True
+
+    def get_log(self, kind):
+        return self.performance_logs.pop(0) if self.performance_logs else []
+
+
+def network_event(method, request_id, url=""):
+    params = {"requestId": request_id, "request": {"url": url}}
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class TestReadiness(unittest.TestCase):
+
+    def test_adaptive_timeouts(self):
+        timeouts = AdaptiveTimeouts(default=5, maximum=60, factor=3)
+        self.assertEqual(timeouts.get("step"), 5)
+        self.assertEqual(timeouts.get("step", default=30), 30)
+        timeouts.observe("step", 0.1)
+        self.assertEqual(timeouts.get("step"), 5)
+        self.assertEqual(timeouts.get("step", default=30), 30)
+        timeouts.observe("step", 4)
+        self.assertEqual(timeouts.get("step"), 12)
+        self.assertEqual(timeouts.get("step", default=30), 30)
+        timeouts.observe("step", 100)
+        self.assertEqual(timeouts.get("step"), 60)
+
+    def test_datatable_redraw_waits_for_draw_event(self):
+        driver = FakeDriver(draw_counts=[1, 1, 2])
+        self.assertTrue(wait_for_datatable_redraw(driver, "example", armed_count=1, timeout=2))
+        self.assertEqual(driver.draw_counts, [2])
+
+    def test_network_idle_tracks_in_flight_requests(self):
+        driver = FakeDriver(performance_logs=[
+            [network_event("Network.requestWillBeSent", "1")],
+            [],
+            [network_event("Network.loadingFinished", "1")],
+        ])
+        self.assertTrue(wait_for_network_idle(driver, idle_time=0.1, timeout=2))
+        self.assertEqual(driver.performance_logs, [])
+
+    def test_network_idle_ignores_unrelated_and_earlier_requests(self):
+        driver = FakeDriver(performance_logs=[
+            [network_event("Network.requestWillBeSent", "old", "https://x/search_results_ranch.php?o=0")],
+            [network_event("Network.requestWillBeSent", "1", "https://x/search_results_ranch.php?o=0"),
+             network_event("Network.requestWillBeSent", "2", "https://analytics.example/beacon")],
+            [network_event("Network.loadingFinished", "1")],
+        ])
+        drain_network_log(driver)
+        started = time.perf_counter()
+        self.assertTrue(wait_for_network_idle(driver, idle_time=0.1, timeout=2, url_filter="search_results_ranch.php"))
+        self.assertLess(time.perf_counter() - started, 1)
+
+    def test_network_idle_gives_up_quietly(self):
+        busy = [[network_event("Network.requestWillBeSent", str(n))] for n in range(100)]
+        driver = FakeDriver(performance_logs=busy)
+        self.assertFalse(wait_for_network_idle(driver, idle_time=0.1, timeout=0.3))
+
+
+if __name__ == "__main__":
+    unittest.main()
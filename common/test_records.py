@@ -0,0 +1,48 @@
+import sys
+import unittest
+
+from common.records import AmgrRecord, ResultSet, ShorthornRecord, name_key
+
+
+class TestRecords(unittest.TestCase):
+
+    def test_record_behaves_like_a_row(self):
+        record = AmgrRecord("Texas", "Lone Star Breeders", "Lone Star Ranch", "(512) 555-0199", "")
+        self.assertEqual(record[1], "Lone Star Breeders")
+        self.assertEqual(record[:2], ["Texas", "Lone Star Breeders"])
+        self.assertEqual(record, ["Texas", "Lone Star Breeders", "Lone Star Ranch", "(512) 555-0199", ""])
+        self.assertEqual(record.state_code, "TX")
+        self.assertEqual(record.name_key, "lone star")
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_wrong_arity_is_rejected(self):
+        with self.assertRaises(TypeError):
+            AmgrRecord("AL", "Hurlbert, John")
+
+    def test_repeated_values_are_interned(self):
+        city = "".join(["CLAN", "TON"])
+        first = ShorthornRecord("Active", "20871", "", "Abby Jones", "Jones Cattle Co", city, "AL")
+        second = ShorthornRecord("Active", "20872", "", "Abby Smith", "", "".join(["CLA", "NTON"]), "AL")
+        self.assertIs(first.city, second.city)
+        self.assertIs(first.city, sys.intern("CLANTON"))
+
+    def test_result_set_columns_are_views(self):
+        results = ResultSet(AmgrRecord, [
+            ("AL", "Hurlbert, John", "Hurlbert Farm", "", ""),
+            ("TX", "Abby Mill", "Abby Mill Farm", "", ""),
+        ])
+        names = results.column("name")
+        self.assertEqual(list(names), ["Hurlbert, John", "Abby Mill"])
+        results.append(("VA", "Blue Ridge", "", "", ""))
+        self.assertEqual(names[-1], "Blue Ridge")
+        self.assertEqual(list(results.column("state_code")), ["AL", "TX", "VA"])
+        self.assertEqual(results.rows()[1][0], "TX")
+        with self.assertRaises(KeyError):
+            results.column("breed")
+
+    def test_name_key_drops_stop_words(self):
+        self.assertEqual(name_key("Abby Mill Farms"), "abby mill")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import itertools
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from common.result_cache import ResultCache, make_key
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(path=os.path.join(self.tmp.name, "results.sqlite3"), ttl=60, stale_ttl=600)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fresh_hit_skips_loader(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return [["TX", "Lone Star Breeders"]]
+
+        params = {"stateID": "43", "breedID": "0", "memberID": "0"}
+        self.assertEqual(self.cache.fetch("amgr", params, loader), [["TX", "Lone Star Breeders"]])
+        self.assertEqual(self.cache.fetch("amgr", dict(reversed(params.items())), loader), [["TX", "Lone Star Breeders"]])
+        self.assertEqual(len(calls), 1)
+
+    def test_stale_served_while_revalidating(self):
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return [["new"]]
+
+        with mock.patch("common.result_cache.time.time", return_value=1000):
+            self.cache.store(make_key("amgr", {"k": 1}), "amgr", [["old"]])
+        with mock.patch("common.result_cache.time.time", return_value=1100):
+            self.assertEqual(self.cache.fetch("amgr", {"k": 1}, loader), [["old"]])
+        self.assertTrue(refreshed.wait(2))
+        for _ in range(50):
+            if not self.cache._refreshing:
+                break
+            threading.Event().wait(0.02)
+        self.assertEqual(self.cache.fetch("amgr", {"k": 1}, loader), [["new"]])
+
+    def test_expired_entry_reloads(self):
+        with mock.patch("common.result_cache.time.time", return_value=1000):
+            self.cache.store(make_key("amgr", {"k": 1}), "amgr", [["old"]])
+        self.assertEqual(self.cache.fetch("amgr", {"k": 1}, lambda: [["new"]]), [["new"]])
+
+    def test_unchanged_rows_only_revalidate(self):
+        key = make_key("shorthorn", {"t": "574"})
+        self.assertTrue(self.cache.store(key, "shorthorn", [["a"]]))
+        self.assertFalse(self.cache.store(key, "shorthorn", [["a"]]))
+
+    def test_size_eviction_and_invalidate(self):
+        cache = ResultCache(path=":memory:", max_entries=2)
+        with mock.patch("common.result_cache.time.time", side_effect=itertools.count(1000)):
+            for i in range(3):
+                cache.store(make_key("amgr", {"i": i}), "amgr", [[i]])
+            cache.store(make_key("shorthorn", {"i": 0}), "shorthorn", [[0]])
+        self.assertEqual(cache.size(), 2)
+        self.assertIsNone(cache.lookup(make_key("amgr", {"i": 1})))
+
+        cache.invalidate(namespace="shorthorn")
+        self.assertEqual(cache.size(), 1)
+        cache.invalidate()
+        self.assertEqual(cache.size(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
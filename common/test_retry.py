@@ -0,0 +1,224 @@
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+
+import requests
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from common.adapters import RegistryAdapter
+from common.metrics import metrics
+from common.records import AmgrRecord
+from common.retry import (
+    CircuitBreaker, CircuitOpen, ParseError, RetryPolicy, _breakers, classify, retry_call
+)
+
+NO_WAIT = RetryPolicy(attempts=3, sleep=lambda seconds: None)
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestClassify(unittest.TestCase):
+
+    def test_kinds(self):
+        self.assertEqual(classify(TimeoutException()), "timeout")
+        self.assertEqual(classify(requests.ReadTimeout()), "timeout")
+        self.assertEqual(classify(StaleElementReferenceException()), "stale")
+        self.assertEqual(classify(http_error(503)), "upstream")
+        self.assertEqual(classify(http_error(429)), "upstream")
+        self.assertEqual(classify(requests.ConnectionError()), "upstream")
+        self.assertEqual(classify(ParseError("no table")), "parse")
+        self.assertEqual(classify(http_error(404)), "fatal")
+        self.assertEqual(classify(KeyError("state")), "fatal")
+        self.assertEqual(classify(CircuitOpen("amgr", 3)), "circuit")
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(base=1, cap=4)
+        for attempt in range(6):
+            delay = policy.backoff(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(4, 2 ** attempt))
+
+
+class TestRetryCall(unittest.TestCase):
+
+    def setUp(self):
+        _breakers.clear()
+        metrics.reset()
+
+    def test_transient_errors_are_retried(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise http_error(502)
+            return "ok"
+
+        self.assertEqual(retry_call(flaky, site="test", policy=NO_WAIT), "ok")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(metrics.counter("retries_total", site="test", error="upstream"), 2)
+
+    def test_fatal_errors_are_not_retried(self):
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise KeyError("state")
+
+        with self.assertRaises(KeyError):
+            retry_call(broken, site="test", policy=NO_WAIT)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(metrics.counter("errors_total", site="test", error="fatal"), 1)
+
+    def test_exhausted_retries_raise_the_last_error(self):
+        with self.assertRaises(ParseError):
+            retry_call(lambda: (_ for _ in ()).throw(ParseError("no table")), site="test", policy=NO_WAIT)
+        self.assertEqual(metrics.counter("retries_total", site="test", error="parse"), 2)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_then_half_opens_then_closes(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("test", threshold=2, reset_after=10, clock=clock)
+        breaker.record_failure()
+        breaker.check()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpen):
+            breaker.check()
+
+        clock.now = 10
+        self.assertEqual(breaker.state, "half-open")
+        breaker.check()
+        with self.assertRaises(CircuitOpen):
+            breaker.check()
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("test", threshold=1, reset_after=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        breaker.check()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+
+
+class ResumingAdapter(RegistryAdapter):
+    name = "flaky"
+    record = AmgrRecord
+
+    def __init__(self, failures):
+        super().__init__(client="client")
+        self.failures = failures
+        self.starts = []
+
+    def fetch_http(self, client, start_page=0):
+        self.starts.append(start_page)
+        for page in range(start_page, 4):
+            if page in self.failures:
+                self.failures.remove(page)
+                raise requests.ConnectionError("reset by peer")
+            yield [["TX", f"Member {page}", "", "", ""]]
+
+    def resume(self, plan, engine, start_page):
+        return self.fetch_http(self.client, start_page=start_page)
+
+
+class TestPipelineResume(unittest.TestCase):
+
+    def setUp(self):
+        _breakers.clear()
+        patcher = mock.patch("common.retry.default_policy", NO_WAIT)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_resumes_from_the_first_missing_page(self):
+        adapter = ResumingAdapter(failures=[2])
+        names = [record.name for record in adapter.records({})]
+
+        self.assertEqual(names, [f"Member {page}" for page in range(4)])
+        self.assertEqual(adapter.starts, [0, 2])
+
+    def test_failure_after_a_page_is_raised_not_truncated(self):
+        adapter = ResumingAdapter(failures=[1, 1, 1])
+        with self.assertRaises(requests.ConnectionError):
+            adapter.search({})
+
+
+class ClientAdapter(RegistryAdapter):
+    """Fetches each page through ``retry_call``, the way the HTTP clients do."""
+
+    name = "guarded"
+    record = AmgrRecord
+
+    def __init__(self):
+        super().__init__(client="client", pool=self)
+        self.healthy = True
+        self.calls = 0
+
+    def get_page(self, page):
+        self.calls += 1
+        if not self.healthy:
+            raise http_error(503)
+        return [["TX", f"Member {page}", "", "", ""]]
+
+    def fetch_http(self, client):
+        for page in range(2):
+            yield retry_call(lambda: self.get_page(page), site=self.name)
+
+    @contextmanager
+    def lease(self):
+        yield "driver"
+
+    def fetch_selenium(self, driver):
+        return iter(())
+
+
+class TestPipelineWithClientRetries(unittest.TestCase):
+
+    def setUp(self):
+        _breakers.clear()
+        self.addCleanup(_breakers.clear)
+        patcher = mock.patch("common.retry.default_policy", NO_WAIT)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.adapter = ClientAdapter()
+
+    def test_exhausted_client_retries_are_not_retried_again(self):
+        self.adapter.healthy = False
+        self.assertEqual(self.adapter.search({}), [])
+        self.assertEqual(self.adapter.calls, NO_WAIT.attempts)
+
+    def test_recovered_site_closes_the_circuit(self):
+        clock = FakeClock()
+        breaker = _breakers["guarded"] = CircuitBreaker("guarded", threshold=3, reset_after=10, clock=clock)
+        self.adapter.healthy = False
+        self.adapter.search({})
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpen):
+            self.adapter.search({})
+
+        clock.now = 10
+        self.adapter.healthy = True
+        self.assertEqual(len(self.adapter.search({})), 2)
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(len(self.adapter.search({})), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
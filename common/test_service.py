@@ -0,0 +1,75 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+
+from common.batch_parse import ParsedQuery
+from common.executor import QueryExecutor
+from common.service import QueryService
+
+
+def fake_parse(command):
+    return ParsedQuery(command, "Texas", None, None, "texas", "", "", "574")
+
+
+class TestQueryService(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+        def amgr(state=None, breed_name=None, member_name=None):
+            with self.lock:
+                self.calls.append(("amgr", state))
+            time.sleep(0.1)
+            return [["TX", "Lone Star Breeders", "Lone Star Ranch", "", ""]]
+
+        def shorthorn(state, city, member_name, t_param):
+            raise RuntimeError("upstream down")
+
+        self.service = QueryService(QueryExecutor(backends={"amgr": amgr, "shorthorn": shorthorn}), parse=fake_parse)
+        self.addCleanup(self.service.close)
+
+    def test_identical_inflight_queries_share_one_scrape(self):
+        async def main():
+            payload = {"command": "Show all breeders in Texas", "registries": ["amgr"]}
+            return await asyncio.gather(self.service.query(payload), self.service.query(dict(payload)))
+
+        first, second = asyncio.run(main())
+        self.assertEqual(self.calls, [("amgr", "Texas")])
+        self.assertEqual(first["results"], second["results"])
+        self.assertEqual(first["results"][0]["rows"][0][1], "Lone Star Breeders")
+
+    def test_structured_query_and_errors(self):
+        result = asyncio.run(self.service.query({"registry": "shorthorn", "params": {
+            "state": "texas", "city": "", "member_name": "", "t_param": "574"}}))
+        self.assertEqual(result["results"][0]["error"], "upstream down")
+        self.assertIsNone(result["query"])
+
+    def test_http_round_trip(self):
+        async def main():
+            server = await self.service.start(port=0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps({"command": "Show all breeders in Texas"}).encode()
+            writer.write(b"POST /query HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            writer.write(b"GET /nowhere HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            raw = await reader.read()
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return raw.decode()
+
+        raw = asyncio.run(main())
+        first, second = raw.split("HTTP/1.1 ")[1:]
+        self.assertTrue(first.startswith("200 OK"))
+        payload = json.loads(first.split("\r\n\r\n", 1)[1])
+        self.assertEqual([r["registry"] for r in payload["results"]], ["amgr", "shorthorn"])
+        self.assertEqual(payload["query"]["location"], "texas")
+        self.assertTrue(second.startswith("404"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from common.records import AMGR_HEADERS, AmgrRecord
+from common.sinks import CsvSink, NdjsonSink, TabulateSink, drain, make_sink
+
+PAGES = [
+    [AmgrRecord("AL", "Hurlbert, John", "Hurlbert Farm", "(205) 555-0142", "")],
+    [AmgrRecord("TX", "Lone Star Breeders", "Lone Star Ranch", "(512) 555-0199", "lonestar.example")],
+]
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class TestSinks(unittest.TestCase):
+
+    def test_ndjson_streams_each_page(self):
+        stream = io.StringIO()
+        sink = NdjsonSink(AMGR_HEADERS, stream=stream)
+        sink.write(PAGES[0])
+        self.assertEqual(json.loads(stream.getvalue())["Name"], "Hurlbert, John")
+        sink.write(PAGES[1])
+        self.assertEqual(len(stream.getvalue().splitlines()), 2)
+
+    def test_csv(self):
+        stream = io.StringIO()
+        self.assertEqual(drain(PAGES, CsvSink(AMGR_HEADERS, stream=stream)), 2)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines[0], "State,Name,Farm,Phone,Website")
+        self.assertEqual(lines[1], 'AL,"Hurlbert, John",Hurlbert Farm,(205) 555-0142,')
+
+    def test_tabulate_buffers_until_close(self):
+        stream = io.StringIO()
+        sink = TabulateSink(AMGR_HEADERS, tablefmt="github", stream=stream)
+        sink.write(PAGES[0])
+        self.assertEqual(stream.getvalue(), "")
+        sink.close()
+        self.assertIn("Hurlbert, John", stream.getvalue())
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            make_sink("xml", AMGR_HEADERS)
+
+    @unittest.skipIf(pq is None, "pyarrow not installed")
+    def test_parquet_row_group_per_page(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "amgr.parquet")
+            drain(PAGES, make_sink("parquet", AMGR_HEADERS, path=path))
+            parquet = pq.ParquetFile(path)
+            self.assertEqual(parquet.num_row_groups, 2)
+            self.assertEqual(parquet.read().column("Name").to_pylist(), ["Hurlbert, John", "Lone Star Breeders"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from common.paths import ROOT_DIR, ensure_registry_paths
+from common import snapshot
+from common.snapshot import SnapshotMissing, SnapshotQueryEngine, SnapshotStore, get_query_engine, take_snapshot
+from common.stub_server import StubServer
+
+ensure_registry_paths()
+from amgr_http_client import AmgrHttpClient  # noqa: E402
+from shorthorn_http_client import SEARCH_RESULTS_PATH, ShorthornHttpClient  # noqa: E402
+
+EMPTY_RESULTS = "<table id='example'><tbody></tbody></table>"
+
+
+def fixture(registry, name):
+    with open(os.path.join(ROOT_DIR, registry, "fixtures", name), encoding="utf-8") as f:
+        return f.read()
+
+
+class TestSnapshot(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        form_page = fixture("amgr", "directory_form.html")
+        results_page = fixture("amgr", "directory_results.html")
+
+        def directory(method, query, form):
+            if method == "GET":
+                return 200, form_page
+            return 200, results_page if form["breedID"] in ("0", "3") else EMPTY_RESULTS
+
+        cls.server = StubServer({
+            "/frm_directorySearch.cfm": directory,
+            "/": fixture("shorthorn", "landing.html"),
+            SEARCH_RESULTS_PATH: fixture("shorthorn", "search_results_ranch.html"),
+        }).start()
+
+        store = SnapshotStore(":memory:")
+        take_snapshot(
+            store,
+            amgr_client=AmgrHttpClient(url=cls.server.base_url + "/frm_directorySearch.cfm"),
+            shorthorn_client=ShorthornHttpClient(base_url=cls.server.base_url),
+        )
+        cls.store = store
+        cls.engine = SnapshotQueryEngine.from_store(store)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_crawl_requests(self):
+        shorthorn_query = [q for method, path, q, _ in self.server.requests if path == SEARCH_RESULTS_PATH][0]
+        self.assertEqual((shorthorn_query["t"], shorthorn_query["l"]), ("897", "United States|"))
+        self.assertIsNotNone(self.store.crawled_at("amgr"))
+
+    def test_amgr_queries(self):
+        self.assertEqual(len(self.engine.amgr()), 3)
+        self.assertEqual([row[1] for row in self.engine.amgr(state="Texas")], ["Lone Star Breeders", "Abby Mill"])
+        self.assertEqual(len(self.engine.amgr(state="TX", breed_name="(B) - Boer")), 2)
+        self.assertEqual(self.engine.amgr(breed_name="(K) - Kiko"), [])
+        self.assertEqual([row[1] for row in self.engine.amgr(member_name="hurl")], ["Hurlbert, John"])
+
+    def test_shorthorn_queries(self):
+        self.assertEqual(len(self.engine.shorthorn("United States")), 3)
+        self.assertEqual([row[1] for row in self.engine.shorthorn("alabama", "jemison")], ["10452"])
+        self.assertEqual([row[1] for row in self.engine.shorthorn(member_name="abby")], ["10452", "20871"])
+        self.assertEqual(self.engine.shorthorn("texas"), [])
+
+
+class TestSharedQueryEngine(unittest.TestCase):
+
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "snapshot.sqlite3")
+        self.store = SnapshotStore(path)
+        for name in ("_shared_store", "_shared_engine", "_shared_refresher"):
+            patcher = mock.patch.object(snapshot, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.engine = lambda: get_query_engine(path)
+
+    def test_uncrawled_registry_raises(self):
+        with self.assertRaises(SnapshotMissing):
+            self.engine().amgr()
+        self.store.replace_amgr([["TX", "Lone Star Breeders", "", "", "", ["(B) - Boer"]]])
+        self.assertEqual(len(self.engine().amgr()), 1)
+        with self.assertRaises(SnapshotMissing):
+            self.engine().shorthorn("United States")
+
+    def test_reloads_after_the_store_is_rewritten(self):
+        self.store.replace_shorthorn([["Member", "1", "", "Abby", "", "Jemison", "AL"]])
+        first = self.engine()
+        self.assertIs(self.engine(), first)
+        self.assertEqual(len(first.shorthorn()), 1)
+
+        SnapshotStore(self.store.path).replace_shorthorn([
+            ["Member", "1", "", "Abby", "", "Jemison", "AL"], ["Member", "2", "", "Ben", "", "Selma", "AL"],
+        ])
+        self.assertEqual(len(self.engine().shorthorn()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from selenium.common.exceptions import JavascriptException
+
+from common.table_extract import datatable_data, extract_rows, normalize_text, rows_from_html
+
+PAGE = """
+<table id="example"><tbody>
+  <tr><td>1</td><td>TX</td><td>Lone&nbsp;Star  Breeders</td></tr>
+  <tr><td colspan="3">No further entries</td></tr>
+</tbody></table>
+"""
+
+
+class FakeDriver:
+    def __init__(self, script_result=None, script_error=None):
+        self.script_result = script_result
+        self.script_error = script_error
+        self.page_source = PAGE
+        self.calls = 0
+
+    def execute_script(self, script, *args):
+        self.calls += 1
+        if self.script_error:
+            raise self.script_error
+        return self.script_result
+
+
+class TestTableExtract(unittest.TestCase):
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text(" Jones\xa0Cattle \n Co "), "Jones Cattle Co")
+        self.assertEqual(normalize_text(None), "")
+
+    def test_rows_from_html(self):
+        rows = rows_from_html(PAGE, "//table[@id='example']/tbody/tr", 3)
+        self.assertEqual(rows, [["1", "TX", "Lone Star Breeders"]])
+
+    def test_extract_rows_single_script_call(self):
+        driver = FakeDriver(script_result=[["1", "TX", "Lone\xa0Star "], ["No further entries"]])
+        rows = extract_rows(driver, "#example tbody tr", "//table[@id='example']/tbody/tr", 3)
+        self.assertEqual(rows, [["1", "TX", "Lone Star"]])
+        self.assertEqual(driver.calls, 1)
+
+    def test_extract_rows_falls_back_to_page_source(self):
+        driver = FakeDriver(script_error=JavascriptException("blocked"))
+        rows = extract_rows(driver, "#example tbody tr", "//table[@id='example']/tbody/tr", 3)
+        self.assertEqual(rows, [["1", "TX", "Lone Star Breeders"]])
+
+    def test_datatable_data(self):
+        driver = FakeDriver(script_result={"total": 2, "rows": [["1", "TX", "Lone\xa0Star"], ["2", "AL", " Hurlbert "]]})
+        self.assertEqual(datatable_data(driver, "example"), ([["1", "TX", "Lone Star"], ["2", "AL", "Hurlbert"]], 2))
+        self.assertIsNone(datatable_data(FakeDriver(script_result=None), "example"))
+
+
+if __name__ == "__main__":
+    unittest.main()
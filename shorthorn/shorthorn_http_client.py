@@ -0,0 +1,179 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import urlencode
+
+from lxml import html
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.http_session import make_session
+from common.metrics import incr, span
+from common.option_cache import OptionList, option_cache
+from common.records import SHORTHORN_HEADERS
+from common.retry import retry_call
+from common.table_extract import normalize_text, rows_from_html
+
+BASE_URL = "https://shorthorn.digitalbeef.com"
+SEARCH_RESULTS_PATH = "/modules/DigitalBeef-Landing/ajax/search_results_ranch.php"
+HEADERS = SHORTHORN_HEADERS
+RESULT_ROWS_CSS = "#dvSearchResults table table tr[id^='tr_']"
+RESULT_ROWS_XPATH = "//tr[starts-with(@id, 'tr_')]"
+LOCATION_SELECT = "search-member-location"
+
+
+def build_search_params(selected_value: str, city: str, member_name: str, t_param: str, offset: int = 0) -> dict:
+    return {
+        "u": "",
+        "p": "",
+        "o": str(offset),
+        "l": selected_value,
+        "v": member_name.upper() if member_name else "",
+        "herd_code": "",
+        "ranch_id": "",
+        "address_city": city.upper() if city else "",
+        "address_email": "",
+        "phone_number": "",
+        "t": t_param
+    }
+
+
+def build_search_url(selected_value: str, city: str, member_name: str, t_param: str, base_url: str = BASE_URL) -> str:
+    params = build_search_params(selected_value, city, member_name, t_param)
+    return f"{base_url}{SEARCH_RESULTS_PATH}?{urlencode(params)}"
+
+
+def parse_location_options(page_html: str):
+    tree = html.fromstring(page_html)
+    return OptionList(
+        (normalize_text(option.text_content()), option.get("value", ""))
+        for option in tree.xpath(f"//select[@id='{LOCATION_SELECT}']/option")
+    )
+
+
+def match_location(options, state: str):
+    value = options.value_for(state, partial=False) if isinstance(options, OptionList) else None
+    if value is not None:
+        return options.text_for(value), value
+    state = state.lower()
+    for text, value in options:
+        if state in text.lower():
+            return text, value
+    for text, value in options:
+        if "united states" in text.lower():
+            return text, value
+    return None
+
+
+def parse_result_rows(fragment: str):
+    return [cells[:7] for cells in rows_from_html(fragment, RESULT_ROWS_XPATH, 7)]
+
+
+class ShorthornHttpClient:
+    def __init__(self, base_url: str = BASE_URL, session=None, timeout: float = 15, cache=None, options=None):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or make_session()
+        self.timeout = timeout
+        self.cache = cache
+        self.options = options or option_cache
+
+    def location_options(self):
+        return self.options.get(("shorthorn.locations", self.base_url), self._load_location_options)
+
+    def _load_location_options(self):
+        return parse_location_options(retry_call(self._get_landing, site="shorthorn"))
+
+    def _get_landing(self):
+        with span("http_fetch", registry="shorthorn", request="form"):
+            response = self.session.get(self.base_url + "/", timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def resolve_location(self, state: str):
+        return match_location(self.location_options(), state)
+
+    def fetch_fragment(self, params: dict) -> str:
+        """One results fragment, retried on its own so a hiccup on a later page does not restart the walk."""
+        return retry_call(lambda: self._get_fragment(params), site="shorthorn")
+
+    def _get_fragment(self, params: dict) -> str:
+        with span("http_fetch", registry="shorthorn", request="results"):
+            response = self.session.get(self.base_url + SEARCH_RESULTS_PATH, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def load_rows(self, params: dict):
+        fragment = self.fetch_fragment(params)
+        with span("extract_page", registry="shorthorn", engine="http"):
+            rows = parse_result_rows(fragment)
+        incr("pages_total", registry="shorthorn", engine="http")
+        incr("rows_total", len(rows), registry="shorthorn", engine="http")
+        return rows
+
+    def fetch_rows(self, params: dict):
+        if self.cache is None:
+            return self.load_rows(params)
+        key = {"url": self.base_url, **{name: params[name] for name in ("l", "v", "address_city", "t", "o")}}
+        return self.cache.fetch("shorthorn", key, lambda: self.load_rows(params))
+
+    def iter_pages(self, params: dict, concurrency: int = 4, max_pages: int = 500):
+        """Yield result pages for successive ``o`` offsets until the rows run out.
+
+        The first page fixes the page size; later offsets advance by it and
+        up to ``concurrency`` of them are fetched ahead, but pages are yielded
+        in offset order. Rows are deduplicated on Member #, and walking stops
+        at a short page or at a page that adds no new members.
+        """
+        seen = set()
+
+        def fresh(rows):
+            page = [row for row in rows if row[1] not in seen]
+            seen.update(row[1] for row in page)
+            return page
+
+        first = self.fetch_rows(dict(params, o="0"))
+        page_size = len(first)
+        yield fresh(first)
+        if not page_size:
+            return
+
+        offsets = (page_size * index for index in range(1, max_pages))
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            pending = deque()
+            try:
+                while True:
+                    for offset in islice(offsets, concurrency - len(pending)):
+                        pending.append(pool.submit(self.fetch_rows, dict(params, o=str(offset))))
+                    if not pending:
+                        return
+                    rows = pending.popleft().result()
+                    page = fresh(rows)
+                    if page:
+                        yield page
+                    if len(rows) < page_size or not page:
+                        return
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def search(self, state: str, city: str, member_name: str, t_param: str, all_pages: bool = True,
+               concurrency: int = 4):
+        selected_text, url, pages = self.search_pages(state, city, member_name, t_param, all_pages, concurrency)
+        return selected_text, url, [row for page in pages for row in page]
+
+    def search_pages(self, state: str, city: str, member_name: str, t_param: str, all_pages: bool = True,
+                     concurrency: int = 4):
+        """Like ``search`` but returns an iterator of pages, streamed as they arrive."""
+        location = self.resolve_location(state)
+        if location is None:
+            raise LookupError(f"No location option matches '{state}'")
+        selected_text, selected_value = location
+
+        params = build_search_params(selected_value, city, member_name, t_param)
+        url = build_search_url(selected_value, city, member_name, t_param, base_url=self.base_url)
+        pages = self.iter_pages(params, concurrency) if all_pages else iter([self.fetch_rows(params)])
+        return selected_text, url, pages
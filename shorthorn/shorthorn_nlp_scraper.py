@@ -1,57 +1,68 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select, WebDriverWait
+from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from tabulate import tabulate
-from urllib.parse import urlencode
-import time
-import spacy
-
-nlp = spacy.load("en_core_web_sm")
-
-def extract_place_parts(command: str):
-    doc = nlp(command)
+from itertools import chain
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from shorthorn_http_client import (
+    BASE_URL, HEADERS, LOCATION_SELECT, RESULT_ROWS_CSS, RESULT_ROWS_XPATH, SEARCH_RESULTS_PATH, ShorthornHttpClient,
+    build_search_params, build_search_url, match_location,
+)
+from common.adapters import RegistryAdapter, register_adapter
+from common.fast_parse import city_from_command, fast_parse, member_name_from_command
+from common.log import get_logger
+from common.metrics import incr, span, start_exporters
+from common.nlp_loader import get_nlp
+from common.option_cache import option_cache, read_select_options
+from common.parse_cache import cached_parse
+from common.records import ShorthornRecord
+from common.retry import classify, retry_call
+from common.readiness import drain_network_log, timed_wait, wait_for_network_idle
+from common.table_extract import extract_rows
+
+logger = get_logger("shorthorn")
+
+
+@cached_parse("shorthorn.extract_place_parts")
+def extract_place_parts(command: str, doc=None):
+    if doc is None:
+        fast = fast_parse(command)
+        if fast is not None:
+            return (fast.state or "").lower(), fast.city
+        doc = get_nlp()(command)
     state = ""
-    city = ""
+    city = city_from_command(command.lower())
 
     gpe_entities = [ent.text.strip() for ent in doc.ents if ent.label_ == "GPE"]
 
-    lower_command = command.lower()
-    if "city" in lower_command:
-        try:
-            parts = lower_command.split("city")
-            for part in reversed(parts):
-                tokens = part.strip().split()
-                if tokens:
-                    city = tokens[-1].title()
-                    break
-        except Exception:
-            pass
-
     for ent in gpe_entities:
         ent_lower = ent.lower()
-        if city and city.lower() in ent_lower:
+        if city and city in ent_lower:
             continue
         if not state:
             state = ent.title()
 
-    return state.lower(), city.lower()
-
+    return state.lower(), city
 
-def extract_member_name(command: str):
-    command_lower = command.lower()
 
-    if "member name" in command_lower:
-        after = command_lower.split("member name", 1)[1].strip()
-        for loc_word in [" from ", " in ", " near ", " at "]:
-            if loc_word in after:
-                after = after.split(loc_word, 1)[0].strip()
-        return after.strip(" '\"")
+@cached_parse("shorthorn.extract_member_name")
+def extract_member_name(command: str, doc=None):
+    member_name = member_name_from_command(command.lower())
+    if member_name is not None:
+        return member_name
 
-    doc = nlp(command)
+    if doc is None:
+        fast = fast_parse(command)
+        if fast is not None:
+            return fast.member_name
+    if doc is None:
+        doc = get_nlp()(command)
     names = []
     current_name = []
 
@@ -73,9 +84,6 @@ def extract_member_name(command: str):
 
 
 
-def clean_cell(cell):
-    return cell.text.replace("\xa0", " ").strip()
-
 def get_t_param(state: str, city: str, member_name: str, original_command: str) -> str:
     if any(keyword in original_command.lower() for keyword in ["all states", "nationwide", "entire country", "all us", "united states"]):
         return "897"
@@ -89,129 +97,207 @@ def get_t_param(state: str, city: str, member_name: str, original_command: str)
         return "803"
     return "574"
 
-def search_members_table(command: str):
-    state, city = extract_place_parts(command)
-    member_name = extract_member_name(command)
+def print_member_rows(table_data):
+    with span("format", registry="shorthorn"):
+        print(tabulate(table_data, headers=HEADERS, tablefmt="github"))
 
-    if not state and not member_name and not city:
-        if "all states" not in command.lower():
-            print("⚠️ No recognizable input found (state, city, or member name).")
-            return None
-
-    if not state or "all states" in command.lower():
-        state = "United States"
 
-    print(f"🔍 Searching for members related to: {command}")
+def fill_ranch_search(driver, state: str, city: str, member_name: str):
+    with span("navigate", registry="shorthorn"):
+        driver.get(BASE_URL)
+        timed_wait(driver, "shorthorn.load_form", EC.presence_of_element_located((By.ID, "search-member-location")))
 
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
+    with span("form_fill", registry="shorthorn"):
+        selected_value = fill_ranch_fields(driver, state, city, member_name)
+    if selected_value is None:
+        return None
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    driver.get("https://shorthorn.digitalbeef.com")
+    with span("submit", registry="shorthorn"):
+        drain_network_log(driver)
+        driver.execute_script("doSearch_Ranch();")
 
-    try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "search-member-location"))
+        timed_wait(
+            driver, "shorthorn.search_results",
+            EC.presence_of_element_located((By.CSS_SELECTOR, "#dvSearchResults table table")), default=30
         )
+        wait_for_network_idle(driver, step="shorthorn.search_idle", url_filter=SEARCH_RESULTS_PATH)
+    return selected_value
 
-        select_element = Select(driver.find_element(By.ID, "search-member-location"))
-        matched = False
-        selected_value = ""
 
-        for option in select_element.options:
-            if state.lower() in option.text.lower():
-                select_element.select_by_visible_text(option.text)
-                selected_value = option.get_attribute("value")
-                print(f"✅ Selected location: {option.text}")
-                matched = True
-                break
+def fill_ranch_fields(driver, state: str, city: str, member_name: str):
+    options = option_cache.get(
+        ("shorthorn.locations", BASE_URL), lambda: read_select_options(driver, [LOCATION_SELECT])[LOCATION_SELECT]
+    )
+    location = match_location(options, state)
+    if location is None:
+        return None
+    selected_text, selected_value = location
+    if state.lower() not in selected_text.lower():
+        logger.warning("⚠️ No specific state match found. Falling back to 'United States'.")
+    Select(driver.find_element(By.ID, LOCATION_SELECT)).select_by_value(selected_value)
+    logger.info(f"✅ Selected location: {selected_text}")
+
+    if city:
+        city_input = driver.find_element(By.ID, "ranch_search_city")
+        city_input.clear()
+        city_input.send_keys(city)
+        logger.info(f"🏙️ City: {city}")
+
+    if member_name:
+        name_input = driver.find_element(By.ID, "ranch_search_val")
+        name_input.clear()
+        name_input.send_keys(member_name)
+        logger.info(f"🧑 Member Name: {member_name}")
+    return selected_value
+
+
+def count_page(page):
+    incr("pages_total", registry="shorthorn", engine="selenium")
+    incr("rows_total", len(page), registry="shorthorn", engine="selenium")
+    return page
+
+
+@register_adapter
+class ShorthornAdapter(RegistryAdapter):
+    name = "shorthorn"
+    headers = HEADERS
+    record = ShorthornRecord
+
+    def __init__(self, client=None, pool=None, query_engine=None, all_pages: bool = True):
+        super().__init__(client, pool, query_engine)
+        self.all_pages = all_pages
+
+    def make_client(self, cache, **options):
+        return ShorthornHttpClient(cache=cache, **options)
+
+    def parse(self, command: str, doc=None):
+        terms = resolve_search_terms(command, doc=doc)
+        if terms is None:
+            return None
+        state, city, member_name = terms
+        return {
+            "state": state, "city": city, "member_name": member_name,
+            "t_param": get_t_param(state, city, member_name, command),
+        }
 
-        if not matched:
-            print(f"⚠️ No specific state match found. Falling back to 'United States'.")
-            for option in select_element.options:
-                if "united states" in option.text.lower():
-                    select_element.select_by_visible_text(option.text)
-                    selected_value = option.get_attribute("value")
-                    print(f"🌎 Searching in state: {option.text}")
-                    matched = True
-                    break
-
-        if not matched:
-            print("❗ Error: Could not select a valid state.")
+    def params_for(self, query):
+        if query.location is None:
             return None
+        return {"state": query.location, "city": query.city, "member_name": query.member_name, "t_param": query.t_param}
 
-        if city:
-            city_input = driver.find_element(By.ID, "ranch_search_city")
-            city_input.clear()
-            city_input.send_keys(city)
-            print(f"🏙️ City: {city}")
+    def search_url(self, params: dict):
+        location = self.client.resolve_location(params["state"])
+        if location is None:
+            return None
+        return build_search_url(
+            location[1], params["city"], params["member_name"], params["t_param"], base_url=self.client.base_url
+        )
 
-        if member_name:
-            name_input = driver.find_element(By.ID, "ranch_search_val")
-            name_input.clear()
-            name_input.send_keys(member_name)
-            print(f"🧑 Member Name: {member_name}")
+    def fetch_http(self, client, state, city, member_name, t_param):
+        selected_text, _, pages = client.search_pages(state, city, member_name, t_param, all_pages=self.all_pages)
+        logger.info(f"✅ Selected location: {selected_text}")
+        yield from pages
 
-        driver.execute_script("doSearch_Ranch();")
+    def fetch_selenium(self, driver, state, city, member_name, t_param):
+        if retry_call(lambda: fill_ranch_search(driver, state, city, member_name), site="shorthorn") is None:
+            raise LookupError(f"No location option matches '{state}'")
+        with span("extract_page", registry="shorthorn", engine="selenium"):
+            rows = retry_call(lambda: extract_rows(driver, RESULT_ROWS_CSS, RESULT_ROWS_XPATH, 7), site="shorthorn")
+        yield count_page([cells[:7] for cells in rows])
+
+    def fetch_snapshot(self, query_engine, state, city, member_name, t_param=None):
+        yield query_engine.shorthorn(state, city, member_name)
+
+    def shards(self):
+        """One shard per location, skipping country-wide options whose regions are listed too."""
+        values = [value for _, value in self.client.location_options()]
+        regional = {value.split("|")[0] for value in values if not value.endswith("|")}
+        return [{"l": value} for value in values if not value.endswith("|") or value[:-1] not in regional]
+
+    def crawl_shard(self, l):
+        pages = self.client.iter_pages(build_search_params(l, "", "", "574"))
+        return [list(row) for page in pages for row in page]
+
+    def record_key(self, row):
+        return row[1]
+
+    def merge_shards(self, shard_rows):
+        members = {}
+        for rows in shard_rows:
+            for row in rows:
+                members.setdefault(row[1], list(row))
+        return list(members.values())
+
+
+def iter_member_pages(command: str, engine: str = "http", client=None, pool=None, all_pages: bool = True):
+    """Yield pages of ShorthornRecord rows as soon as each one is parsed."""
+    adapter = ShorthornAdapter(client=client, pool=pool, all_pages=all_pages)
+    params = adapter.parse(command)
+    if params is not None:
+        yield from adapter.pages(params, engine)
+
+
+def iter_member_records(command: str, **kwargs):
+    return chain.from_iterable(iter_member_pages(command, **kwargs))
 
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#dvSearchResults table table"))
-        )
-        time.sleep(1)
-
-        t_param = get_t_param(state, city, member_name, command)
-
-        base_url = "https://shorthorn.digitalbeef.com/modules/DigitalBeef-Landing/ajax/search_results_ranch.php"
-        params = {
-            "u": "",
-            "p": "",
-            "o": "0",
-            "l": selected_value,
-            "v": member_name.upper() if member_name else "",
-            "herd_code": "",
-            "ranch_id": "",
-            "address_city": city.upper() if city else "",
-            "address_email": "",
-            "phone_number": "",
-            "t": t_param
-        }
-        constructed_url = f"{base_url}?{urlencode(params)}"
-        print(f"\n🔗 Constructed search URL:\n{constructed_url}")
 
-        outer_div = driver.find_element(By.ID, "dvSearchResults")
-        table = outer_div.find_element(By.CSS_SELECTOR, "table table")
+@cached_parse("shorthorn.resolve_search_terms")
+def resolve_search_terms(command: str, doc=None):
+    if doc is None and fast_parse(command) is None:
+        doc = get_nlp()(command)
+    state, city = extract_place_parts(command, doc=doc)
+    member_name = extract_member_name(command, doc=doc)
 
-        rows = table.find_elements(By.CSS_SELECTOR, "tr[id^='tr_']")
-        if not rows:
-            print("⚠️ No valid member rows found.")
-            return constructed_url
+    if not state and not member_name and not city:
+        if "all states" not in command.lower():
+            return None
+
+    if not state or "all states" in command.lower():
+        state = "United States"
 
-        headers = ['Type', 'Member #', 'Prefix', 'Member Name', 'DBA', 'City', 'State/Prov']
-        table_data = []
+    return state, city, member_name
 
-        for row in rows:
-            cols = row.find_elements(By.TAG_NAME, "td")
-            if len(cols) >= 7:
-                row_data = [clean_cell(cols[i]) for i in range(7)]
-                table_data.append(row_data)
 
-        if not table_data:
-            print("ℹ️ No member records matched the search.")
-            return constructed_url
+def search_members_snapshot(command: str, engine=None):
+    adapter = ShorthornAdapter(query_engine=engine)
+    params = adapter.parse(command)
+    if params is None:
+        logger.warning("⚠️ No recognizable input found (state, city, or member name).")
+        return []
 
-        print(tabulate(table_data, headers=headers, tablefmt="github"))
+    table_data = adapter.search(params, "snapshot")
+    if not table_data:
+        logger.info("ℹ️ No member records matched the search.")
+    else:
+        print_member_rows(table_data)
+    return table_data
 
-        return constructed_url
 
+def search_members_table(command: str, engine: str = "http", client=None):
+    adapter = ShorthornAdapter(client=client)
+    params = adapter.parse(command)
+    if params is None:
+        logger.warning("⚠️ No recognizable input found (state, city, or member name).")
+        return None
+
+    logger.info(f"🔍 Searching for members related to: {command}")
+
+    try:
+        table_data = adapter.search(params, engine)
+        constructed_url = adapter.search_url(params)
     except Exception as e:
-        print(f"❗ Error during scraping or processing: {str(e)}")
+        logger.error(f"❗ Error during scraping or processing ({classify(e)}): {str(e)}")
         return None
-    finally:
-        driver.quit()
+    logger.info(f"\n🔗 Constructed search URL:\n{constructed_url}")
+
+    if not table_data:
+        logger.info("ℹ️ No member records matched the search.")
+    else:
+        print_member_rows(table_data)
+    return constructed_url
 
 if __name__ == "__main__":
+    start_exporters()
     print("🌐 NLP Ranch Search (type 'exit' to quit)")
     while True:
         try:
@@ -0,0 +1,96 @@
+import os
+import unittest
+
+from shorthorn_http_client import (
+    ShorthornHttpClient, SEARCH_RESULTS_PATH, parse_result_rows, match_location
+)
+from common.stub_server import StubServer, paged_member_results
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class TestShorthornHttpClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubServer({
+            "/": os.path.join(FIXTURES, "landing.html"),
+            SEARCH_RESULTS_PATH: os.path.join(FIXTURES, "search_results_ranch.html"),
+        }).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_parse_result_rows(self):
+        with open(os.path.join(FIXTURES, "search_results_ranch.html"), encoding="utf-8") as f:
+            rows = parse_result_rows(f.read())
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0], ["Active", "10452", "ABY", "Abby Mill Farm", "", "JEMISON", "AL"])
+        self.assertEqual(rows[1][3:5], ["Abby Jones", "Jones Cattle Co"])
+
+    def test_match_location(self):
+        options = [("United States", "United States|"), ("Virginia", "United States|VA")]
+        self.assertEqual(match_location(options, "virginia"), ("Virginia", "United States|VA"))
+        self.assertEqual(match_location(options, "atlantis"), ("United States", "United States|"))
+
+    def test_search_against_stub(self):
+        self.server.requests.clear()
+        client = ShorthornHttpClient(base_url=self.server.base_url)
+        selected_text, url, rows = client.search("virginia", "jemison", "abby", "803")
+
+        self.assertEqual(selected_text, "Virginia")
+        self.assertIn("united+states%7cva", url.lower())
+        self.assertIn("t=803", url)
+        self.assertEqual(len(rows), 3)
+
+        searches = [request for request in self.server.requests if request[1] == SEARCH_RESULTS_PATH]
+        method, path, query, _ = min(searches, key=lambda request: int(request[2]["o"]))
+        self.assertEqual((method, path), ("GET", SEARCH_RESULTS_PATH))
+        self.assertEqual(query["l"], "United States|VA")
+        self.assertEqual(query["v"], "ABBY")
+        self.assertEqual(query["address_city"], "JEMISON")
+        self.assertEqual(query["o"], "0")
+
+
+class TestShorthornPagination(unittest.TestCase):
+
+    def walk(self, route, **kwargs):
+        routes = {"/": os.path.join(FIXTURES, "landing.html"), SEARCH_RESULTS_PATH: route}
+        with StubServer(routes) as server:
+            client = ShorthornHttpClient(base_url=server.base_url)
+            _, _, pages = client.search_pages("alabama", "", "", "897", **kwargs)
+            pages = list(pages)
+            offsets = sorted(int(query["o"]) for _, path, query, _ in server.requests if path == SEARCH_RESULTS_PATH)
+        return pages, offsets
+
+    def test_walks_offsets_until_short_page(self):
+        pages, offsets = self.walk(paged_member_results(total=23, page_size=5), concurrency=3)
+
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+        self.assertEqual([row[1] for page in pages for row in page], [str(n) for n in range(23)])
+        self.assertEqual(offsets[:5], [0, 5, 10, 15, 20])
+
+    def test_stops_when_offset_is_ignored(self):
+        pages, _ = self.walk(os.path.join(FIXTURES, "search_results_ranch.html"))
+
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(len(pages[0]), 3)
+
+    def test_single_page_when_not_walking(self):
+        pages, offsets = self.walk(paged_member_results(total=23, page_size=5), all_pages=False)
+
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(offsets, [0])
+
+    def test_search_returns_every_page(self):
+        routes = {"/": os.path.join(FIXTURES, "landing.html"),
+                  SEARCH_RESULTS_PATH: paged_member_results(total=23, page_size=5)}
+        with StubServer(routes) as server:
+            _, _, rows = ShorthornHttpClient(base_url=server.base_url).search("alabama", "", "", "897")
+
+        self.assertEqual([row[1] for row in rows], [str(n) for n in range(23)])
+
+
+if __name__ == "__main__":
+    unittest.main()